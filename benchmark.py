@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmarks for fix_dates.py on generated CSV files.
+
+Generates a CSV with the requested shape, times sniff_dialect,
+decide_columns, try_parse, format_iso and an end-to-end convert_file on it,
+prints a summary and writes the results as JSON, so runs on different
+commits can be compared (--compare).
+"""
+
+import argparse
+import contextlib
+import csv
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Optional
+
+import fix_dates
+
+# order of the values in a date column; AMBIGUOUS is DMY with day and month both <= 12
+ORDER_FORMATS = {
+    "DMY": ("%d/%m/%Y", "%d.%m.%Y", "%d-%m-%Y"),
+    "MDY": ("%m/%d/%Y", "%m-%d-%Y"),
+    "YMD": ("%Y-%m-%d", "%Y/%m/%d"),
+    "AMBIGUOUS": ("%d/%m/%Y",),
+}
+JUNK = ("", "n/a", "TBD", "31/31/2020", "unknown", "-")
+TEXT = ("hello", "foo, bar", 'say "hi"', "line\nbreak", "plain text", "")
+TIMEZONES = ("Z", "+02:00", "-05:00", "+0530")
+
+def parse_mix(text: str) -> Dict[str, float]:
+    """'DMY=2,MDY=1' -> normalised weights per order."""
+    weights: Dict[str, float] = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip().upper()
+        if name not in ORDER_FORMATS:
+            raise argparse.ArgumentTypeError(f"unknown order {name!r} (use {', '.join(ORDER_FORMATS)})")
+        weights[name] = float(weight) if weight else 1.0
+    total = sum(weights.values())
+    return {k: v / total for k, v in weights.items()}
+
+def _date_value(rng: random.Random, order: str, fmt: str, time_share: float, tz_share: float) -> str:
+    d = datetime(2000, 1, 1) + timedelta(days=rng.randint(0, 9000))
+    if order == "AMBIGUOUS":
+        d = d.replace(day=rng.randint(1, 12))
+    s = d.strftime(fmt)
+    if rng.random() < time_share:
+        t = d + timedelta(seconds=rng.randint(0, 86399))
+        s += t.strftime(" %H:%M:%S" if rng.random() < 0.5 else " %H:%M")
+        if rng.random() < tz_share:
+            s += rng.choice(TIMEZONES)
+    return s
+
+def generate_csv(path: str, rows: int, cols: int, date_share: float, mix: Dict[str, float],
+                 time_share: float, tz_share: float, junk_rate: float, seed: int = 0) -> Dict[int, str]:
+    """
+    Write a CSV with a header and `rows` data rows of `cols` columns, of which
+    about date_share are date columns. Each date column gets one order drawn
+    from mix and one format for it; time_share of its values carry a time,
+    tz_share of those a UTC offset, and junk_rate of its cells are junk.
+    Returns column index -> order for the date columns.
+    """
+    rng = random.Random(seed)
+    n_dates = max(1, round(cols * date_share)) if date_share > 0 else 0
+    date_cols = sorted(rng.sample(range(cols), min(n_dates, cols)))
+    orders = list(mix)
+    layout: Dict[int, str] = {}
+    formats: Dict[int, str] = {}
+    for i in date_cols:
+        layout[i] = rng.choices(orders, weights=[mix[o] for o in orders])[0]
+        formats[i] = rng.choice(ORDER_FORMATS[layout[i]])
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow([f"date_{i}" if i in layout else f"field_{i}" for i in range(cols)])
+        for r in range(rows):
+            row = []
+            for i in range(cols):
+                if i in layout:
+                    if rng.random() < junk_rate:
+                        row.append(rng.choice(JUNK))
+                    else:
+                        row.append(_date_value(rng, layout[i], formats[i], time_share, tz_share))
+                elif i % 3 == 0:
+                    row.append(str(r))
+                elif i % 3 == 1:
+                    row.append(f"{rng.random() * 1000:.2f}")
+                else:
+                    row.append(rng.choice(TEXT))
+            w.writerow(row)
+    return layout
+
+def measure(fn: Callable[[], object], repeat: int, items: int = 1) -> Dict[str, float]:
+    """Run fn repeat times; best and median wall seconds, and microseconds per item at best."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    best = min(times)
+    return {"best_s": best, "median_s": statistics.median(times), "repeat": repeat,
+            "items": items, "us_per_item": best / items * 1e6 if items else 0.0}
+
+def run_benchmarks(path: str, repeat: int, sample_rows: int) -> Dict[str, Dict[str, float]]:
+    results: Dict[str, Dict[str, float]] = {}
+    size = os.path.getsize(path)
+
+    def sniff() -> None:
+        with open(path, "rb") as fb:
+            fix_dates.sniff_dialect(fb)
+    results["sniff_dialect"] = measure(sniff, repeat)
+
+    header, sample, _, _ = fix_dates.sample_column_values(path, "utf-8", sample_rows)
+    quiet = io.StringIO()
+
+    def decide() -> None:
+        with contextlib.redirect_stdout(quiet):
+            fix_dates.decide_columns(header, sample, True, None, None)
+    results["decide_columns"] = measure(decide, repeat, len(sample))
+
+    with contextlib.redirect_stdout(quiet):
+        decisions = fix_dates.decide_columns(header, sample, True, None, None)
+    values = [(r[i], order) for r in sample for i, order in decisions.items()
+              if order and i < len(r) and r[i].strip()]
+    results["try_parse"] = measure(lambda: [fix_dates.try_parse(v, o) for v, o in values], repeat, len(values))
+
+    parsed = [dt for dt in (fix_dates.try_parse(v, o) for v, o in values) if dt is not None]
+    results["format_iso"] = measure(lambda: [fix_dates.format_iso(dt) for dt in parsed], repeat, len(parsed))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        out = os.path.join(tmp, "out.csv")
+
+        def convert() -> None:
+            with contextlib.redirect_stdout(io.StringIO()):
+                fix_dates.convert_file(path, out, sample_rows=sample_rows, no_prompt=True)
+        with open(path, newline="", encoding="utf-8") as f:
+            rows = sum(1 for _ in csv.reader(f)) - 1
+        results["convert_file"] = measure(convert, repeat, rows)
+        results["convert_file"]["mb_per_s"] = size / results["convert_file"]["best_s"] / 1e6
+    return results
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def print_results(results: Dict[str, Dict[str, float]], baseline: Optional[Dict[str, Dict[str, float]]]) -> None:
+    for name, r in results.items():
+        line = f"  {name:<15} best {r['best_s'] * 1000:10.2f} ms  median {r['median_s'] * 1000:10.2f} ms"
+        if r["items"] > 1:
+            line += f"  {r['us_per_item']:8.2f} us/item"
+        if baseline and name in baseline:
+            line += f"  ({baseline[name]['best_s'] / r['best_s']:.2f}x vs baseline)"
+        print(line)
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark fix_dates.py on a generated CSV.")
+    ap.add_argument("--rows", type=int, default=20000, help="Data rows to generate (default: 20000)")
+    ap.add_argument("--cols", type=int, default=8, help="Columns to generate (default: 8)")
+    ap.add_argument("--date-share", type=float, default=0.5,
+                    help="Share of the columns that hold dates (default: 0.5)")
+    ap.add_argument("--mix", type=parse_mix, default=parse_mix("DMY,MDY,YMD,AMBIGUOUS"),
+                    help="Relative weights of the date column orders, e.g. DMY=2,MDY=1,YMD=1,AMBIGUOUS=1 "
+                         "(default: equal)")
+    ap.add_argument("--time-share", type=float, default=0.3,
+                    help="Share of date values that carry a time (default: 0.3)")
+    ap.add_argument("--tz-share", type=float, default=0.2,
+                    help="Share of the timed values that carry a UTC offset (default: 0.2)")
+    ap.add_argument("--junk-rate", type=float, default=0.02,
+                    help="Share of date cells that are empty or junk (default: 0.02)")
+    ap.add_argument("--seed", type=int, default=0, help="Random seed for the generator (default: 0)")
+    ap.add_argument("--repeat", type=int, default=3, help="Runs per benchmark; the best is reported (default: 3)")
+    ap.add_argument("--sample-rows", type=int, default=200, help="--sample-rows for detection (default: 200)")
+    ap.add_argument("--input", help="Benchmark this CSV instead of generating one")
+    ap.add_argument("--keep", metavar="FILE", help="Also save the generated CSV here")
+    ap.add_argument("-o", "--output", default="bench_results.json",
+                    help="Write the results as JSON here (default: bench_results.json)")
+    ap.add_argument("--compare", metavar="FILE", help="Show speed-ups against an earlier results JSON")
+    args = ap.parse_args()
+
+    params = {k: v for k, v in vars(args).items() if k not in ("output", "compare", "keep")}
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.input
+        layout = None
+        if path is None:
+            path = args.keep or os.path.join(tmp, "bench.csv")
+            layout = generate_csv(path, args.rows, args.cols, args.date_share, args.mix,
+                                  args.time_share, args.tz_share, args.junk_rate, args.seed)
+            print(f"Generated {args.rows} rows x {args.cols} columns "
+                  f"({os.path.getsize(path) / 1e6:.1f} MB), date columns: "
+                  + ", ".join(f"{i}={o}" for i, o in layout.items()))
+        results = run_benchmarks(path, args.repeat, args.sample_rows)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            previous = json.load(f)
+        baseline = previous["results"]
+        if previous.get("params") != json.loads(json.dumps(params)):
+            print(f"Note: {args.compare} was run with different parameters.")
+    print_results(results, baseline)
+
+    report = {
+        "commit": git_commit(),
+        "time": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "params": params,
+        "layout": layout,
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+        f.write("\n")
+    print(f"Wrote: {args.output}")
+
+if __name__ == "__main__":
+    main()
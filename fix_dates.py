@@ -2,18 +2,20 @@
 # -*- coding: utf-8 -*-
 
 import argparse
+import codecs
+import contextlib
 import csv
+import importlib
+import io
+import os
 import sys
 import re
-from datetime import datetime
-from typing import List, Dict, Tuple, Optional
-from collections import Counter, defaultdict
-
-try:
-    from dateutil import parser as du
-except ImportError:
-    print("This script requires python-dateutil. Install with: pip install python-dateutil")
-    sys.exit(1)
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import Callable, Iterable, Iterator, List, Dict, Tuple, Optional
+from collections import Counter, OrderedDict, defaultdict
+from functools import lru_cache
+from itertools import chain, islice
 
 DATE_LIKE_RE = re.compile(
     r"""
@@ -38,6 +40,51 @@ DATE_LIKE_RE = re.compile(
 
 SEP_RE = re.compile(r"[\/\-\.\s]+")
 
+# Purely numeric subset of DATE_LIKE_RE, handled natively without dateutil.
+NUMERIC_DATE_RE = re.compile(
+    r"""
+    ^\s*
+    (?P<a>[1-9]\d{3}|\d{1,2})(?P<sep>[\-\/\.\ ])(?P<b>\d{1,2})(?P=sep)(?P<c>[1-9]\d{3}|\d{1,2})
+    (?:[ T]
+      (?P<hour>\d{1,2}):(?P<minute>\d{2})(?::(?P<second>\d{2})(?:\.(?P<frac>\d+))?)?
+      (?:\s*(?P<tz>Z|[+\-]\d{2}:?\d{2}))?
+    )?
+    \s*$
+    """,
+    re.VERBOSE,
+)
+
+# Month-name subset of DATE_LIKE_RE ("25 Aug 2024", "Aug 25, 2024"), also
+# handled natively; only the month names dateutil knows match, and only 2-digit
+# or 4-digit years (dateutil's handling of "025"/"0025" depends on separators).
+MONTH_NAMES = {
+    "jan": 1, "january": 1, "feb": 2, "february": 2, "mar": 3, "march": 3,
+    "apr": 4, "april": 4, "may": 5, "jun": 6, "june": 6, "jul": 7, "july": 7,
+    "aug": 8, "august": 8, "sep": 9, "sept": 9, "september": 9,
+    "oct": 10, "october": 10, "nov": 11, "november": 11, "dec": 12, "december": 12,
+}
+_MONTH_ALT = "|".join(sorted(MONTH_NAMES, key=len, reverse=True))
+MONTH_NAME_DATE_RE = re.compile(
+    r"""
+    ^\s*
+    (?:
+      (?P<a>\d{1,2})[\-\/\.\s](?P<mon>(?i:""" + _MONTH_ALT + r"""))[\-\/\.\s](?P<c>\d{2}|[1-9]\d{3})
+      |
+      (?P<mon2>(?i:""" + _MONTH_ALT + r"""))\s+(?P<b>\d{1,2}),?\s+(?P<c2>\d{2}|[1-9]\d{3})
+    )
+    (?:[ T]
+      (?P<hour>\d{1,2}):(?P<minute>\d{2})(?::(?P<second>\d{2})(?:\.(?P<frac>\d+))?)?
+      (?:\s*(?P<tz>Z|[+\-]\d{2}:?\d{2}))?
+    )?
+    \s*$
+    """,
+    re.VERBOSE,
+)
+
+# Same two-digit year window as dateutil: [-50, +49] years around now.
+_THIS_YEAR = time.localtime().tm_year
+_CENTURY = _THIS_YEAR // 100 * 100
+
 def tokenize_ymd_like(s: str) -> Optional[Tuple[Optional[int], Optional[int], Optional[int]]]:
     parts = SEP_RE.split(s.strip())
     nums = []
@@ -50,46 +97,407 @@ def tokenize_ymd_like(s: str) -> Optional[Tuple[Optional[int], Optional[int], Op
         return nums[0], nums[1], nums[2]
     return None
 
+# Character classes for could_be_date: digit, letter, separator, anything else.
+_CHAR_CLASSES = str.maketrans(
+    {**{chr(c): "?" for c in range(128)},
+     **dict.fromkeys("0123456789", "0"),
+     **dict.fromkeys("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz", "a"),
+     **dict.fromkeys("-/.:+, \t\n\r\f\v", " ")}
+)
+
+# Longest supported value is about "September 30, 2024 23:59:59.123456789 +02:00";
+# at most a month name plus "T" and "Z" are letters.
+MAX_DATE_LEN = 64
+MAX_DATE_LETTERS = 11
+
+def could_be_date(s: str) -> bool:
+    """
+    Cheap pre-check for stripped values, run before DATE_LIKE_RE: False means the
+    value is too long, has no digit, has too many letters, or has a character no
+    date format uses. Non-ASCII text is left to the regex.
+    """
+    if len(s) > MAX_DATE_LEN:
+        return False
+    if not s.isascii():
+        return True
+    classes = s.translate(_CHAR_CLASSES)
+    return "0" in classes and "?" not in classes and classes.count("a") <= MAX_DATE_LETTERS
+
 def is_date_like(s: str) -> bool:
     if not s or not s.strip():
         return False
     return bool(DATE_LIKE_RE.match(s.strip()))
 
+def add_votes(votes: Counter, toks: Tuple[Optional[int], Optional[int], Optional[int]]) -> None:
+    a, b, c = toks
+    if a and a > 31:
+        votes["YMD"] += 2
+        return
+    if c and c > 31 and a and a <= 31:
+        if a > 12:
+            votes["DMY"] += 2
+        elif b and b > 12:
+            votes["MDY"] += 2
+        else:
+            votes["DMY"] += 1
+            votes["MDY"] += 1
+        return
+    if a and a > 12:
+        votes["DMY"] += 1
+    if b and b > 12:
+        votes["MDY"] += 1
+    if 1000 <= (a or 0) <= 9999 and (b or 0) <= 12 and (c or 0) <= 31:
+        votes["YMD"] += 1
+
+def pick_order(votes: Counter) -> Optional[str]:
+    if not votes:
+        return None
+    best = votes.most_common()
+    if len(best) == 1 or best[0][1] > best[1][1]:
+        return best[0][0]
+    return None
+
 def infer_order(samples: List[str]) -> Tuple[Optional[str], Counter]:
     votes = Counter()
     for s in samples:
         toks = tokenize_ymd_like(s)
-        if not toks:
-            continue
-        a, b, c = toks
-        if a and a > 31:
-            votes["YMD"] += 2
+        if toks:
+            add_votes(votes, toks)
+    return pick_order(votes), votes
+
+# Roles name the tokens in position order; map each to the (year, month, day) indices.
+_ROLE_INDEX = {"ymd": (0, 1, 2), "ydm": (0, 2, 1), "dmy": (2, 1, 0), "mdy": (2, 0, 1)}
+
+def ymd_roles(a: int, b: int, c: int, ystridx: Optional[int],
+              yearfirst: bool, dayfirst: bool) -> str:
+    """Mirror dateutil's resolution of three numeric tokens; returns e.g. 'dmy'."""
+    if a > 31 or ystridx == 0 or (yearfirst and b <= 12 and c <= 31):
+        if dayfirst and c <= 12:
+            return "ydm"
+        return "ymd"
+    if a > 12 or (dayfirst and b <= 12):
+        return "dmy"
+    return "mdy"
+
+_DAYS_IN_MONTH = (0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+def _check_fields(year: int, month: int, day: int, short_year: bool, g: Optional[Dict[str, Optional[str]]],
+                  ) -> Optional[Tuple[int, int, int, int, int, int, int, Optional[int]]]:
+    """
+    Validate date fields (and the time groups in g, if any). Two-digit years
+    use dateutil's window around the current year. Returns (year, month, day,
+    hour, minute, second, microsecond, UTC offset in minutes or None).
+    """
+    if short_year:
+        year += _CENTURY
+        if year >= _THIS_YEAR + 50:
+            year -= 100
+        elif year < _THIS_YEAR - 50:
+            year += 100
+    if not (1 <= month <= 12) or year < 1 or day < 1:
+        return None
+    if day > _DAYS_IN_MONTH[month]:
+        if month != 2 or day != 29 or not (year % 4 == 0 and (year % 100 != 0 or year % 400 == 0)):
+            return None
+
+    hour = minute = second = micro = 0
+    offset = None
+    if g is not None:
+        hour = int(g["hour"])
+        minute = int(g["minute"])
+        if g.get("second") is not None:
+            second = int(g["second"])
+        if g.get("frac") is not None:
+            micro = int(g["frac"][:6].ljust(6, "0"))
+        if hour > 23 or minute > 59 or second > 59:
+            return None
+        tz = g.get("tz")
+        if tz == "Z":
+            offset = 0
+        elif tz:
+            mins = int(tz[1:3]) * 60 + int(tz[-2:])
+            if mins >= 24 * 60:
+                return None
+            offset = -mins if tz[0] == "-" else mins
+    return year, month, day, hour, minute, second, micro, offset
+
+def _build_datetime(year: int, month: int, day: int, short_year: bool,
+                    g: Optional[Dict[str, Optional[str]]]) -> Optional[datetime]:
+    """Validate the fields as _check_fields does and build the datetime."""
+    f = _check_fields(year, month, day, short_year, g)
+    if f is None:
+        return None
+    tzinfo = None if f[7] is None else timezone.utc if f[7] == 0 else timezone(timedelta(minutes=f[7]))
+    return datetime(f[0], f[1], f[2], f[3], f[4], f[5], f[6], tzinfo=tzinfo)
+
+def _build_iso(year: int, month: int, day: int, short_year: bool,
+               g: Optional[Dict[str, Optional[str]]]) -> Optional[str]:
+    """Validate the fields as _check_fields does and give format_iso's string, without a datetime."""
+    f = _check_fields(year, month, day, short_year, g)
+    if f is None:
+        return None
+    return iso_from_fields(*f)
+
+class _Padded(dict):
+    """n -> n zero-padded to `width` digits, each computed on first use."""
+
+    def __init__(self, width: int):
+        super().__init__()
+        self.width = width
+
+    def __missing__(self, n: int) -> str:
+        s = self[n] = f"{n:0{self.width}d}"
+        return s
+
+# zero-padded fields for iso_from_fields: 0-99, and years as they come up
+_PAD2 = tuple(f"{n:02d}" for n in range(100))
+_PAD_YEAR = _Padded(4)
+
+def iso_from_fields(year: int, month: int, day: int, hour: int = 0, minute: int = 0, second: int = 0,
+                    micro: int = 0, offset: Optional[int] = None) -> str:
+    """
+    format_iso of the datetime with these fields, offset being minutes east
+    of UTC (None for naive): the date alone at a naive midnight, otherwise
+    date and time, with microseconds only if non-zero and the offset if aware.
+    """
+    date_part = f"{_PAD_YEAR[year]}-{_PAD2[month]}-{_PAD2[day]}"
+    if offset is None and not (hour or minute or second or micro):
+        return date_part
+    s = f"{date_part}T{_PAD2[hour]}:{_PAD2[minute]}:{_PAD2[second]}"
+    if micro:
+        s = f"{s}.{micro:06d}"
+    if offset is None:
+        return s
+    sign = "-" if offset < 0 else "+"
+    hours, mins = divmod(abs(offset), 60)
+    return f"{s}{sign}{_PAD2[hours]}:{_PAD2[mins]}"
+
+def _ystridx(toks: Tuple[str, str, str]) -> Tuple[bool, Optional[int]]:
+    """Return (ok, index of the 4-digit year token if any); not ok if there are two."""
+    long_toks = [i for i, t in enumerate(toks) if len(t) > 2]
+    if len(long_toks) > 1:
+        return False, None
+    return True, (long_toks[0] if long_toks else None)
+
+def _numeric_parse(m: "re.Match[str]", order: Optional[str], build=_build_datetime) -> Tuple[Optional[datetime], str]:
+    """fast_parse, also returning the roles the tokens were resolved to (build: see parse_value)."""
+    toks = m.group("a", "b", "c")
+    ok, ystridx = _ystridx(toks)
+    if not ok:
+        return None, ""
+    vals = (int(toks[0]), int(toks[1]), int(toks[2]))
+    roles = ymd_roles(vals[0], vals[1], vals[2], ystridx, order == "YMD", order == "DMY")
+    yi, mi, di = _ROLE_INDEX[roles]
+    g = m.groupdict() if m.group("hour") is not None else None
+    return build(vals[yi], vals[mi], vals[di], ystridx is None, g), roles
+
+def month_name_parse(m: "re.Match[str]", order: Optional[str], build=_build_datetime) -> Optional[datetime]:
+    """
+    Build a datetime from a MONTH_NAME_DATE_RE match the way dateutil resolves
+    a month name and two numbers: a 4-digit year makes the other number the
+    day; otherwise the numbers' sizes and yearfirst decide. build: see
+    parse_value.
+    """
+    if m.group("mon") is not None:
+        mstridx, toks = 1, (m.group("a"), m.group("mon"), m.group("c"))
+    else:
+        mstridx, toks = 0, (m.group("mon2"), m.group("b"), m.group("c2"))
+    vals = [MONTH_NAMES[t.lower()] if i == mstridx else int(t) for i, t in enumerate(toks)]
+    if vals[2] > 100:
+        yi, mi, di = 2, mstridx, 1 - mstridx
+    elif mstridx == 0:
+        yi, mi, di = (1, 0, 2) if vals[1] > 31 else (2, 0, 1)
+    elif vals[0] > 31 or (order == "YMD" and vals[2] <= 31):
+        yi, mi, di = 0, 1, 2
+    else:
+        yi, mi, di = 2, 1, 0
+    g = m.groupdict() if m.group("hour") is not None else None
+    return build(vals[yi], vals[mi], vals[di], vals[yi] < 100, g)
+
+def fast_parse(m: "re.Match[str]", order: Optional[str]) -> Optional[datetime]:
+    """
+    Build a datetime from a NUMERIC_DATE_RE match, giving the same result as
+    dateutil would for the same text and order. None if the value is invalid.
+    """
+    return _numeric_parse(m, order)[0]
+
+# --- Per-column format templates -------------------------------------------
+#
+# A template is a strftime-like string such as "%d/%m/%Y %H:%M". "%-d" style
+# codes mean the field is not zero-padded, "%:z" is a "+HH:MM" offset and "%z"
+# a "+HHMM" one; "%f" is any number of fractional digits.
+
+FORMAT_TOKEN_RE = re.compile(r"%-?[dmyYHMSf]|%:?z|.", re.DOTALL)
+
+_FORMAT_PATTERNS = {
+    "%d": r"(?P<d>\d{2})", "%-d": r"(?P<d>\d{1,2})",
+    "%m": r"(?P<m>\d{2})", "%-m": r"(?P<m>\d{1,2})",
+    "%y": r"(?P<y>\d{2})", "%-y": r"(?P<y>\d{1,2})",
+    "%Y": r"(?P<y>[1-9]\d{3})",
+    "%H": r"(?P<hour>\d{2})", "%-H": r"(?P<hour>\d{1,2})",
+    "%M": r"(?P<minute>\d{2})",
+    "%S": r"(?P<second>\d{2})",
+    "%f": r"(?P<frac>\d+)",
+    "%z": r"(?P<tz>[+\-]\d{4})",
+    "%:z": r"(?P<tz>[+\-]\d{2}:\d{2})",
+    "Z": r"(?P<tz>Z)",
+}
+
+def describe_value(m: "re.Match[str]", order: Optional[str]) -> Optional[Tuple[str, str]]:
+    """
+    Describe one NUMERIC_DATE_RE match as a fully padded template, plus the
+    field letters that appear without zero-padding in this value.
+    """
+    toks = m.group("a", "b", "c")
+    ok, ystridx = _ystridx(toks)
+    if not ok:
+        return None
+    letters = ymd_roles(int(toks[0]), int(toks[1]), int(toks[2]), ystridx,
+                        order == "YMD", order == "DMY")
+    unpadded = "".join(l for l, t in zip(letters, toks) if len(t) == 1)
+    fmt = m.group("sep").join("%Y" if len(t) == 4 else f"%{l}" for l, t in zip(letters, toks))
+    if m.group("hour") is not None:
+        if len(m.group("hour")) == 1:
+            unpadded += "H"
+        fmt += m.string[m.end("c")] + "%H:%M"
+        if m.group("second") is not None:
+            fmt += ":%S"
+        if m.group("frac") is not None:
+            fmt += ".%f"
+        tz = m.group("tz")
+        if tz:
+            if m.string[m.start("tz") - 1].isspace():
+                fmt += " "
+            fmt += "Z" if tz == "Z" else ("%:z" if ":" in tz else "%z")
+    return fmt, unpadded
+
+@lru_cache(maxsize=None)
+def _roles_stable(roles: str, short_year: bool, order: Optional[str]) -> bool:
+    """
+    True if dateutil would assign the tokens to roles for every valid date, so
+    a template with that field order can skip the per-value resolution.
+    """
+    yearfirst, dayfirst = order == "YMD", order == "DMY"
+    ystridx = None if short_year else roles.index("y")
+    # resolution only compares tokens against 12 and 31
+    years = (0, 1, 12, 13, 31, 32) if short_year else (2000,)
+    for y in years:
+        for mo in range(1, 13):
+            for d in range(1, 32):
+                vals = {"y": y, "m": mo, "d": d}
+                a, b, c = (vals[r] for r in roles)
+                if ymd_roles(a, b, c, ystridx, yearfirst, dayfirst) != roles:
+                    return False
+    return True
+
+def infer_format(samples: List[str], order: Optional[str], min_share: float = 0.5) -> Optional[str]:
+    """
+    Infer the dominant template of a column's numeric samples under the chosen
+    order. None if no single template covers at least min_share of them.
+    """
+    groups: Dict[str, str] = {}
+    counts: Counter = Counter()
+    total = 0
+    for s in samples:
+        m = NUMERIC_DATE_RE.match(s)
+        if m is None:
             continue
-        if c and c > 31 and a and a <= 31:
-            if a > 12:
-                votes["DMY"] += 2
-            elif b and b > 12:
-                votes["MDY"] += 2
-            else:
-                votes["DMY"] += 1
-                votes["MDY"] += 1
+        total += 1
+        desc = describe_value(m, order)
+        if desc is None:
             continue
-        if a and a > 12:
-            votes["DMY"] += 1
-        if b and b > 12:
-            votes["MDY"] += 1
-        if 1000 <= (a or 0) <= 9999 and (b or 0) <= 12 and (c or 0) <= 31:
-            votes["YMD"] += 1
-    if not votes:
-        return None, votes
-    best = votes.most_common()
-    if len(best) == 1 or best[0][1] > best[1][1]:
-        return best[0][0], votes
-    return None, votes
+        fmt, unpadded = desc
+        counts[fmt] += 1
+        groups[fmt] = groups.get(fmt, "") + unpadded
+    if not counts:
+        return None
+    fmt, n = counts.most_common(1)[0]
+    if n < min_share * total:
+        return None
+    for letter in set(groups[fmt]):
+        fmt = fmt.replace(f"%{letter}", f"%-{letter}")
+    return fmt
 
-def try_parse(s: str, order: Optional[str]) -> Optional[datetime]:
-    if not s or not s.strip():
+def _compile_template(fmt: str, order: Optional[str]) -> Optional[Tuple["re.Pattern[str]", bool]]:
+    """The regex of a template and whether its year is 2-digit; None if it can't be compiled safely."""
+    pattern = []
+    letters = []
+    for tok in FORMAT_TOKEN_RE.findall(fmt):
+        if tok in _FORMAT_PATTERNS:
+            pattern.append(_FORMAT_PATTERNS[tok])
+            if tok.lstrip("%-") in ("d", "m", "y", "Y"):
+                letters.append(tok.lstrip("%-").lower())
+        elif tok.startswith("%") and len(tok) > 1:
+            return None
+        else:
+            pattern.append(re.escape(tok))
+    if sorted(letters) != ["d", "m", "y"]:
+        return None
+    short_year = "%Y" not in fmt
+    if not _roles_stable("".join(letters), short_year, order):
+        return None
+    try:
+        return re.compile(r"\s*" + "".join(pattern) + r"\s*$"), short_year
+    except re.error:
+        return None
+
+def compile_format(fmt: str, order: Optional[str],
+                   build=_build_datetime) -> Optional[Callable[[str], Optional[datetime]]]:
+    """
+    Compile a template into a parse function for one column. The function gives
+    the same result as try_parse(s, order) for values matching the template and
+    None otherwise (the ISO string instead with build=_build_iso). Returns None
+    if the template can't be compiled safely.
+    """
+    compiled = _compile_template(fmt, order)
+    if compiled is None:
+        return None
+    rx, short_year = compiled
+    has_time = "(?P<hour>" in rx.pattern
+
+    def parse(s: str) -> Optional[datetime]:
+        m = rx.match(s)
+        if m is None:
+            return None
+        return build(int(m.group("y")), int(m.group("m")), int(m.group("d")),
+                     short_year, m.groupdict() if has_time else None)
+    return parse
+
+# dateutil.parser, imported by dateutil_parser() the first time a value needs it;
+# False once the import has failed.
+_du = None
+
+def dateutil_parser():
+    """
+    Return dateutil's parser module, importing it on first use so that runs
+    which never need it don't pay for the import; None if python-dateutil
+    isn't installed.
+    """
+    global _du
+    if _du is None:
+        try:
+            from dateutil import parser
+        except ImportError:
+            _du = False
+        else:
+            _du = parser
+    return _du or None
+
+def _dateutil_parse(s: str, order: Optional[str]) -> Optional[datetime]:
+    """dateutil's parse with the hints for order; None if it fails or dateutil is missing."""
+    du = dateutil_parser()
+    if du is None:
+        return None
+    try:
+        return du.parse(s, **_dateutil_kwargs(order))
+    except Exception:
         return None
+
+def _dateutil_iso(s: str, order: Optional[str]) -> Optional[str]:
+    dt = _dateutil_parse(s, order)
+    return format_iso(dt) if dt is not None else None
+
+def _dateutil_kwargs(order: Optional[str]) -> Dict[str, bool]:
     kwargs = {}
     if order == "DMY":
         kwargs["dayfirst"] = True
@@ -97,23 +505,263 @@ def try_parse(s: str, order: Optional[str]) -> Optional[datetime]:
         kwargs["dayfirst"] = False
     elif order == "YMD":
         kwargs["yearfirst"] = True
-    try:
-        return du.parse(s, **kwargs)
-    except Exception:
+    return kwargs
+
+def try_parse(s: str, order: Optional[str]) -> Optional[datetime]:
+    if not s or not s.strip():
         return None
+    m = NUMERIC_DATE_RE.match(s)
+    if m is not None:
+        return fast_parse(m, order)
+    m = MONTH_NAME_DATE_RE.match(s)
+    if m is not None:
+        return month_name_parse(m, order)
+    return _dateutil_parse(s, order)
+
+# Outcomes reported by parse_value
+PARSED_ORDER = "order"
+PARSED_FALLBACK = "fallback"
+PARSE_FAILED = "failed"
+# counted by convert_file for cells left as they are (see is_iso_output)
+ISO_SKIPPED = "iso_skipped"
+
+# which parser parse_value used, counted for --profile
+METHOD_TEMPLATE = "template"
+METHOD_NUMERIC = "numeric"
+METHOD_MONTH_NAME = "month name"
+METHOD_DATEUTIL = "dateutil"
+METHOD_SERIAL = "serial"
+
+def parse_value(s: str, order: str,
+                parse: Optional[Callable[[str], Optional[datetime]]] = None,
+                methods: Optional[Counter] = None, build=_build_datetime) -> Tuple[Optional[datetime], str]:
+    """
+    Parse one cell under the column's order, falling back to the default
+    interpretation, in a single pass and without raising. Returns the datetime
+    and whether it was PARSED_ORDER, PARSED_FALLBACK or PARSE_FAILED.
+
+    Gives the same datetime as try_parse(s, order) or try_parse(s, None), but
+    numeric and month-name values never reach dateutil and other ones reach it
+    at most once per distinct set of hints. If methods is given, the parser that
+    settled the value (METHOD_*) is counted in it.
+
+    With build=_build_iso, the result is format_iso's string instead, and only
+    dateutil's results are datetimes on the way (parse must then come from
+    compile_format with the same build).
+    """
+    if not s or not s.strip():
+        return None, PARSE_FAILED
+    if parse is not None:
+        dt = parse(s)
+        if dt is not None:
+            if methods is not None:
+                methods[METHOD_TEMPLATE] += 1
+            return dt, PARSED_ORDER
+    m = NUMERIC_DATE_RE.match(s)
+    if m is not None:
+        if methods is not None:
+            methods[METHOD_NUMERIC] += 1
+        dt, roles = _numeric_parse(m, order, build)
+        if dt is not None:
+            return dt, (PARSED_ORDER if roles == order.lower() else PARSED_FALLBACK)
+        dt = _numeric_parse(m, None, build)[0]
+        return dt, (PARSED_FALLBACK if dt is not None else PARSE_FAILED)
+    m = MONTH_NAME_DATE_RE.match(s)
+    if m is not None:
+        if methods is not None:
+            methods[METHOD_MONTH_NAME] += 1
+        attempt = lambda o: month_name_parse(m, o, build)
+    else:
+        if methods is not None:
+            methods[METHOD_DATEUTIL] += 1
+        dateutil_parse = _dateutil_iso if build is _build_iso else _dateutil_parse
+        attempt = lambda o: dateutil_parse(s, o)
+    dt = attempt(order)
+    if dt is not None:
+        return dt, PARSED_ORDER
+    # MDY hints are dateutil's defaults, so only DMY/YMD can differ on retry
+    if order in ("DMY", "YMD"):
+        dt = attempt(None)
+        if dt is not None:
+            return dt, PARSED_FALLBACK
+    return None, PARSE_FAILED
+
+ORDERS = (None, "YMD", "DMY", "MDY")
+
+def _numeric_orders_ok(m: "re.Match[str]") -> Dict[Optional[str], bool]:
+    """Whether a NUMERIC_DATE_RE match parses under each of ORDERS, tokenising it once."""
+    toks = m.group("a", "b", "c")
+    ok, ystridx = _ystridx(toks)
+    if not ok:
+        return dict.fromkeys(ORDERS, False)
+    vals = (int(toks[0]), int(toks[1]), int(toks[2]))
+    g = m.groupdict() if m.group("hour") is not None else None
+    by_roles: Dict[str, bool] = {}
+    result: Dict[Optional[str], bool] = {}
+    for order in ORDERS:
+        roles = ymd_roles(vals[0], vals[1], vals[2], ystridx, order == "YMD", order == "DMY")
+        if roles not in by_roles:
+            yi, mi, di = _ROLE_INDEX[roles]
+            by_roles[roles] = _check_fields(vals[yi], vals[mi], vals[di], ystridx is None, g) is not None
+        result[order] = by_roles[roles]
+    return result
+
+def _orders_ok(s: str) -> Dict[Optional[str], bool]:
+    m = NUMERIC_DATE_RE.match(s)
+    if m is not None:
+        return _numeric_orders_ok(m)
+    m = MONTH_NAME_DATE_RE.match(s)
+    if m is not None:
+        return {order: month_name_parse(m, order) is not None for order in ORDERS}
+    # MDY hints are dateutil's defaults
+    result = {order: try_parse(s, order) is not None for order in ("YMD", "DMY", "MDY")}
+    result[None] = result["MDY"]
+    return result
+
+class ColumnProfile:
+    """
+    Detection evidence for one column, gathered in a single pass over its
+    samples: date-likeness, order votes and per-order parse success. Each
+    distinct sample is tokenised and evaluated once.
+    """
+
+    def __init__(self):
+        self.rows = 0
+        self.samples: List[str] = []
+        self.like = 0
+        self.votes: Counter = Counter()
+        self.like_parsed: Counter = Counter()
+        self._other: List[str] = []
+        self._other_voted = 0
+        self._seen: Dict[str, Tuple[bool, Optional[Tuple[int, int, int]], Dict[Optional[str], bool]]] = {}
+        self._other_parsed: Optional[Counter] = None
+
+    def add(self, s: str) -> None:
+        """Add one non-empty, stripped sample value."""
+        self.samples.append(s)
+        seen = self._seen.get(s)
+        if seen is None:
+            possible = could_be_date(s)
+            m = NUMERIC_DATE_RE.match(s) if possible else None
+            if m is not None:
+                # tokenize_ymd_like doesn't split "dd" from "Thh:mm", so defer to it there
+                if "T" in s:
+                    toks = tokenize_ymd_like(s)
+                else:
+                    toks = (int(m.group("a")), int(m.group("b")), int(m.group("c")))
+                seen = (True, toks, _numeric_orders_ok(m))
+            elif possible and DATE_LIKE_RE.match(s):
+                seen = (True, tokenize_ymd_like(s), _orders_ok(s))
+            else:
+                # votes and parses are only needed if the column turns out to be a date
+                seen = (False, None, {})
+            self._seen[s] = seen
+        like, toks, parsed = seen
+        if like:
+            if toks:
+                add_votes(self.votes, toks)
+            self.like += 1
+            for order, ok in parsed.items():
+                if ok:
+                    self.like_parsed[order] += 1
+        else:
+            self._other.append(s)
+            self._other_parsed = None
+
+    def is_date(self) -> bool:
+        """At least 60% of samples look like dates and 60% of those parse under some order."""
+        if not self.samples or self.like / len(self.samples) < 0.6:
+            return False
+        return any(self.like_parsed[order] / self.like >= 0.6 for order in ORDERS)
+
+    def order(self) -> Optional[str]:
+        for s in self._other[self._other_voted:]:
+            like, toks, parsed = self._seen[s]
+            if toks is None:
+                toks = tokenize_ymd_like(s) or ()
+                self._seen[s] = (like, toks, parsed)
+            if toks:
+                add_votes(self.votes, toks)
+        self._other_voted = len(self._other)
+        return pick_order(self.votes)
+
+    def ruled_out(self, limit: int) -> bool:
+        """
+        True if the column can no longer pass is_date() with at most `limit`
+        samples in total: more than 40% of them already failed to look like dates.
+        """
+        return limit > 0 and len(self._other) > 0.4 * limit
+
+    def settled(self, confidence: int) -> bool:
+        """
+        True once more samples are unlikely to change the outcome:
+        - one order leads every other by at least `confidence` votes, and
+          every sample looks like a date that parses under that order;
+        - or `confidence` samples were seen and none looks like a date;
+        - or 4 x `confidence` rows were seen and all were empty.
+        Always False if confidence is 0.
+        """
+        if confidence <= 0:
+            return False
+        n = len(self.samples)
+        if n == 0:
+            return self.rows >= 4 * confidence
+        if self.like == 0:
+            return n >= confidence
+        if not self.votes or self.like != n:
+            return False
+        best = self.votes.most_common(2)
+        lead = best[0][1] - (best[1][1] if len(best) > 1 else 0)
+        return lead >= confidence and self.like_parsed[best[0][0]] == n
+
+    def parsed_counts(self) -> Dict[str, int]:
+        """Samples (date-like or not) that parse under each of DMY/MDY/YMD."""
+        if self._other_parsed is None:
+            self._other_parsed = Counter()
+            for s in self._other:
+                for order, ok in self._seen_other(s).items():
+                    if ok:
+                        self._other_parsed[order] += 1
+        return {order: self.like_parsed[order] + self._other_parsed[order]
+                for order in ("YMD", "DMY", "MDY")}
+
+    def _seen_other(self, s: str) -> Dict[Optional[str], bool]:
+        like, toks, parsed = self._seen[s]
+        if not parsed:
+            parsed = _orders_ok(s)
+            self._seen[s] = (like, toks, parsed)
+        return parsed
+
+def profile_row(profiles: Dict[int, ColumnProfile], row: List[str],
+                confidence: int = 0, limit: int = 0) -> bool:
+    """
+    Add one row's cells to per-column profiles. Columns already settled at
+    `confidence`, or ruled out given at most `limit` samples, are skipped.
+    Returns True if every column is now settled or ruled out.
+    """
+    done = confidence > 0
+    for i, v in enumerate(row):
+        profile = profiles.get(i)
+        if profile is None:
+            profile = profiles[i] = ColumnProfile()
+        elif profile.ruled_out(limit) or profile.settled(confidence):
+            continue
+        profile.rows += 1
+        if v and v.strip():
+            profile.add(v.strip())
+        if done and not (profile.ruled_out(limit) or profile.settled(confidence)):
+            done = False
+    return done and all(p.ruled_out(limit) or p.settled(confidence) for p in profiles.values())
+
+def profile_column(samples: List[str]) -> ColumnProfile:
+    profile = ColumnProfile()
+    for s in samples:
+        if s and s.strip():
+            profile.add(s.strip())
+    return profile
 
 def column_is_date(samples: List[str]) -> bool:
-    non_empty = [s for s in samples if s and s.strip()]
-    if not non_empty:
-        return False
-    like = [s for s in non_empty if is_date_like(s)]
-    if len(like) / len(non_empty) < 0.6:
-        return False
-    for order in (None, "YMD", "DMY", "MDY"):
-        ok = sum(1 for s in like if try_parse(s, order) is not None)
-        if ok / len(like) >= 0.6:
-            return True
-    return False
+    return profile_column(samples).is_date()
 
 def prompt_for_order(col_name: str, samples: List[str]) -> Optional[str]:
     print(f"\nColumn '{col_name}' is ambiguous. Here are sample values:")
@@ -136,79 +784,571 @@ def prompt_for_order(col_name: str, samples: List[str]) -> Optional[str]:
             return None
         print("Invalid choice. Please enter 1, 2, 3, or 4.")
 
-def sniff_dialect(fp, sample_bytes=65536):
-    start = fp.read(sample_bytes)
-    fp.seek(0)
+class PhaseTimer:
+    """Wall and CPU seconds per named phase of a run, for --profile."""
+
+    def __init__(self):
+        self.phases: List[Tuple[str, float, float]] = []
+        # the conversion loop, split into csv reading, converting and writing
+        self.loop: Counter = Counter()
+        self.rows = 0
+
+    @contextlib.contextmanager
+    def phase(self, name: str):
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - wall, time.process_time() - cpu))
+
+# path standing for stdin / stdout
+STDIO = "-"
+
+SNIFF_BYTES = 65536
+
+def sniff_text(start: str):
+    """Guess the dialect and whether there is a header from the first characters of a file."""
     try:
-        dialect = csv.Sniffer().sniff(start.decode(errors="ignore"))
-        has_header = csv.Sniffer().has_header(start.decode(errors="ignore"))
+        dialect = csv.Sniffer().sniff(start)
+        has_header = csv.Sniffer().has_header(start)
     except Exception:
         dialect = csv.excel
         has_header = True
     return dialect, has_header
 
-def sample_column_values(path: str, encoding: str, max_rows: int) -> Tuple[List[str], List[List[str]], csv.Dialect, bool]:
+def sniff_bytes(start: bytes):
+    """Guess the dialect and whether there is a header from the first bytes of a file."""
+    return sniff_text(start.decode(errors="ignore"))
+
+def sniff_dialect(fp, sample_bytes=SNIFF_BYTES):
+    start = fp.read(sample_bytes)
+    fp.seek(0)
+    return sniff_bytes(start)
+
+@contextlib.contextmanager
+def open_mapped(path: str, sequential: bool = False):
+    """
+    A read-only mmap of a local file, so byte ranges are sliced from the page
+    cache without seeks or read buffers; the open binary file instead if it
+    can't be mapped (empty, or on a filesystem without mmap). Read either
+    with read_at. With sequential, the kernel is told to read ahead.
+    """
+    import mmap
     with open(path, "rb") as fb:
-        dialect, has_header = sniff_dialect(fb)
-    rows: List[List[str]] = []
-    header: List[str] = []
-    with open(path, "r", newline="", encoding=encoding, errors="replace") as f:
-        reader = csv.reader(f, dialect)
         try:
-            first = next(reader)
-        except StopIteration:
-            return [], [], dialect, True
-        header = first
-        rows.append(first)
-        for i, r in enumerate(reader, start=1):
-            rows.append(r)
-            if i >= max_rows:
+            mapped = mmap.mmap(fb.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            yield fb
+            return
+        with mapped:
+            if sequential and hasattr(mapped, "madvise"):
+                mapped.madvise(mmap.MADV_SEQUENTIAL)
+            yield mapped
+
+def read_at(source, offset: int, size: int) -> bytes:
+    """size bytes (fewer at the end) at offset of a source from open_mapped."""
+    import mmap
+    if isinstance(source, mmap.mmap):
+        return source[offset:offset + size]
+    source.seek(offset)
+    return source.read(size)
+
+# compressed files: codec module by file extension, and by leading magic bytes
+COMPRESSION_EXTS = {".gz": "gzip", ".bz2": "bz2", ".xz": "lzma"}
+COMPRESSION_MAGIC = {b"\x1f\x8b": "gzip", b"BZh": "bz2", b"\xfd7zXZ\x00": "lzma"}
+CODEC_CHUNK_BYTES = 1 << 20
+
+def compression_of(path: str, check_magic: bool = True) -> Optional[str]:
+    """Codec of a file ('gzip', 'bz2', 'lzma') from its extension or, failing that, its first bytes."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext in COMPRESSION_EXTS:
+        return COMPRESSION_EXTS[ext]
+    if not check_magic or path == STDIO:
+        return None
+    with open(path, "rb") as fb:
+        return _magic_codec(fb.read(6))
+
+def _magic_codec(start: bytes) -> Optional[str]:
+    for magic, codec in COMPRESSION_MAGIC.items():
+        if start.startswith(magic):
+            return codec
+    return None
+
+class _ThreadedReader(io.RawIOBase):
+    """
+    Reads `stream` (e.g. a decompressing file) in a background thread, a few
+    chunks ahead, so codecs that release the GIL work while rows are parsed.
+    """
+
+    def __init__(self, stream, depth: int = 4):
+        import queue
+        import threading
+        self._stream = stream
+        self._chunks: "queue.Queue" = queue.Queue(depth)
+        self._buf = memoryview(b"")
+        self._done = False
+        self._stop = False
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._pump, daemon=True)
+        self._thread.start()
+
+    def _pump(self) -> None:
+        try:
+            while not self._stop:
+                chunk = self._stream.read(CODEC_CHUNK_BYTES)
+                self._chunks.put(chunk)
+                if not chunk:
+                    break
+        except BaseException as e:
+            self._error = e
+            self._chunks.put(b"")
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        while not self._buf and not self._done:
+            chunk = self._chunks.get()
+            if not chunk:
+                self._done = True
+                if self._error is not None:
+                    raise self._error
+            self._buf = memoryview(chunk)
+        n = min(len(b), len(self._buf))
+        b[:n] = self._buf[:n]
+        self._buf = self._buf[n:]
+        return n
+
+    def close(self) -> None:
+        if not self.closed:
+            self._done = self._stop = True
+            # unblock the pump if it waits on a full queue, then let it finish
+            import queue
+            while self._thread.is_alive():
+                try:
+                    self._chunks.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+            self._stream.close()
+        super().close()
+
+class _ThreadedWriter(io.RawIOBase):
+    """Hands written bytes to a background thread that writes them to `stream` (e.g. a compressor)."""
+
+    def __init__(self, stream, depth: int = 4):
+        import queue
+        import threading
+        self._stream = stream
+        self._chunks: "queue.Queue" = queue.Queue(depth)
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._drain, daemon=True)
+        self._thread.start()
+
+    def _drain(self) -> None:
+        while True:
+            chunk = self._chunks.get()
+            if chunk is None:
                 break
+            if self._error is None:
+                try:
+                    self._stream.write(chunk)
+                except BaseException as e:
+                    self._error = e
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:
+        if self._error is not None:
+            raise self._error
+        self._chunks.put(bytes(b))
+        return len(b)
+
+    def close(self) -> None:
+        if not self.closed:
+            self._chunks.put(None)
+            self._thread.join()
+            self._stream.close()
+            if self._error is not None:
+                raise self._error
+        super().close()
+
+# --pipeline: rows per batch handed to the writer thread, and batches that may wait
+PIPELINE_BATCH_ROWS = 1024
+PIPELINE_DEPTH = 8
+
+class _PipelineWriter:
+    """
+    Last stage of --pipeline: collects written rows (writerow) and raw text
+    (write) into batches that a background thread serialises with csv.writer,
+    encodes and writes to the binary stream `fout`. At most `depth` batches
+    wait; writerow blocks beyond that, so memory stays bounded.
+    """
+
+    def __init__(self, fout, encoding: str, dialect, lineterminator: Optional[str] = None,
+                 depth: int = PIPELINE_DEPTH):
+        import queue
+        import threading
+        self._fout = fout
+        self._encoder = codecs.getincrementalencoder(encoding)()
+        self._text = io.StringIO()
+        kwargs = {"lineterminator": lineterminator} if lineterminator else {}
+        self._writer = csv.writer(self._text, dialect, **kwargs)
+        self._batch: list = []
+        self._raw = False
+        self._batches: "queue.Queue" = queue.Queue(depth)
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._drain, daemon=True)
+        self._thread.start()
+
+    def writerow(self, row: List[str]) -> None:
+        self._batch.append(row)
+        if len(self._batch) >= PIPELINE_BATCH_ROWS:
+            self._flush()
+
+    def write(self, text: str) -> None:
+        self._batch.append(text)
+        self._raw = True
+        if len(self._batch) >= PIPELINE_BATCH_ROWS:
+            self._flush()
+
+    def _flush(self) -> None:
+        if self._error is not None:
+            raise self._error
+        self._batches.put((self._batch, self._raw))
+        self._batch = []
+        self._raw = False
+
+    def _drain(self) -> None:
+        while True:
+            item = self._batches.get()
+            if item is None:
+                break
+            if self._error is not None:
+                # keep taking batches so the converter never blocks on a dead writer
+                continue
+            batch, raw = item
+            try:
+                if raw:
+                    for x in batch:
+                        if isinstance(x, str):
+                            self._text.write(x)
+                        else:
+                            self._writer.writerow(x)
+                else:
+                    self._writer.writerows(batch)
+                self._fout.write(self._encoder.encode(self._text.getvalue()))
+                self._text.seek(0)
+                self._text.truncate()
+            except BaseException as e:
+                self._error = e
+
+    def close(self) -> None:
+        if self._thread.is_alive():
+            try:
+                if self._batch:
+                    self._flush()
+            finally:
+                self._batches.put(None)
+                self._thread.join()
+            tail = self._encoder.encode("", final=True)
+            if tail and self._error is None:
+                self._fout.write(tail)
+        if self._error is not None:
+            raise self._error
+
+    def __enter__(self) -> "_PipelineWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+def _codec_open(codec: str, file, mode: str):
+    # imported on use: bz2 and lzma are optional in some Python builds
+    return importlib.import_module(codec).open(file, mode)
+
+def open_binary(path: str, mode: str = "rb", threaded: bool = False):
+    """
+    Open path for binary reading ('rb') or writing ('wb'), (de)compressing in a
+    background thread if needed. With threaded, uncompressed files are also
+    read or written in a background thread.
+    """
+    codec = compression_of(path, check_magic=mode == "rb")
+    if codec is None:
+        if not threaded:
+            return open(path, mode)
+        stream = open(path, mode, buffering=0)
+    else:
+        stream = _codec_open(codec, path, mode)
+    if mode == "rb":
+        return io.BufferedReader(_ThreadedReader(stream), CODEC_CHUNK_BYTES)
+    return io.BufferedWriter(_ThreadedWriter(stream), CODEC_CHUNK_BYTES)
+
+def open_text(path: str, encoding: str, threaded: bool = False):
+    """Open a possibly compressed CSV file for reading by csv.reader (see open_binary for threaded)."""
+    if compression_of(path) is None and not threaded:
+        return open(path, "r", newline="", encoding=encoding, errors="replace")
+    return io.TextIOWrapper(open_binary(path, threaded=threaded), encoding=encoding, errors="replace", newline="")
+
+def output_name(input_path: str) -> str:
+    """Default output path: data.csv -> data_iso.csv, data.csv.gz -> data_iso.csv.gz."""
+    zext = ""
+    if os.path.splitext(input_path)[1].lower() in COMPRESSION_EXTS:
+        input_path, zext = os.path.splitext(input_path)
+    if "." in input_path.rsplit("/", 1)[-1]:
+        base, ext = input_path.rsplit(".", 1)
+        return f"{base}_iso.{ext}{zext}"
+    return f"{input_path}_iso{zext}"
+
+SAMPLE_MODES = ("head", "reservoir", "spread")
+
+# spread sampling: number of evenly spaced probes and bytes read at each
+SPREAD_PROBES = 32
+SPREAD_CHUNK_BYTES = 1 << 20
+
+def _sample_reservoir(reader, max_rows: int, seed: int = 0) -> List[List[str]]:
+    """Uniform sample of max_rows rows from reader (Algorithm R), in file order."""
+    import random
+    rng = random.Random(seed)
+    reservoir: List[Tuple[int, List[str]]] = []
+    for n, r in enumerate(reader):
+        if n < max_rows:
+            reservoir.append((n, r))
+        else:
+            j = rng.randrange(n + 1)
+            if j < max_rows:
+                reservoir[j] = (n, r)
+    reservoir.sort(key=lambda item: item[0])
+    return [r for _, r in reservoir]
+
+def _resync_rows(text: str, dialect, width: int, limit: int, tries: int = 8) -> List[List[str]]:
+    """
+    Parse up to limit rows from a chunk that starts at an arbitrary point of
+    the file. Tries each of the first few line starts and keeps the first one
+    whose rows all have the header's width, so a start inside a quoted
+    multi-line field is skipped. A row that may be cut short by the end of
+    the chunk is dropped.
+    """
+    starts = []
+    pos = text.find("\n")
+    while pos != -1 and len(starts) < tries:
+        starts.append(pos + 1)
+        pos = text.find("\n", pos + 1)
+    if not starts:
+        return []
+
+    def parse(start: int, n: int) -> List[List[str]]:
+        rows = list(islice(csv.reader(io.StringIO(text[start:]), dialect), n + 1))
+        return rows[:n] if len(rows) > n else rows[:-1]
+
+    for start in starts:
+        probe = parse(start, min(limit, 5))
+        if probe and all(len(r) == width for r in probe):
+            return parse(start, limit)
+    return parse(starts[0], limit)
+
+def _sample_spread(path: str, encoding: str, dialect, width: int, max_rows: int) -> List[List[str]]:
+    """
+    Sample rows from evenly spaced byte offsets, reading at most
+    SPREAD_CHUNK_BYTES at each, so huge files are never read in full.
+    The first probe starts at offset 0 and so skips the first row. The
+    rows are shared out evenly, the first probes taking any remainder.
+    """
+    size = os.path.getsize(path)
+    probes = max(1, min(SPREAD_PROBES, max_rows))
+    per_probe, extra = divmod(max_rows, probes)
+    step = size / probes
+    rows: List[List[str]] = []
+    with open_mapped(path) as source:
+        for k in range(probes):
+            offset = int(k * step)
+            # back up one byte so a probe landing on a record start keeps that record
+            chunk = read_at(source, max(offset - 1, 0), min(SPREAD_CHUNK_BYTES, int(step) + 1))
+            text = chunk.decode(encoding, errors="replace")
+            limit = per_probe + (k < extra)
+            rows.extend(r for r in _resync_rows(text, dialect, width, limit) if r)
+    return rows
+
+def _read_head(reader, max_rows: int, has_header: bool, confidence: int = 0,
+               profiles: Optional[Dict[int, ColumnProfile]] = None) -> List[List[str]]:
+    """
+    The first row and up to max_rows more from reader. If a profiles dict is
+    given, the data rows are profiled as they are read and reading stops early
+    once every column is settled at `confidence`.
+    """
+    first = next(reader, None)
+    if first is None:
+        return []
+    rows = [first]
+    limit = max_rows + 1
+    if profiles is not None and not has_header:
+        profile_row(profiles, first, confidence, limit)
+    for i, r in enumerate(reader, start=1):
+        rows.append(r)
+        if profiles is not None and profile_row(profiles, r, confidence, limit):
+            break
+        if i >= max_rows:
+            break
+    return rows
+
+def _sample_view(rows: List[List[str]], has_header: bool) -> Tuple[List[str], List[List[str]]]:
+    """Header and data rows of a sample, padded to the widest row (rows are not modified)."""
     width = max(len(r) for r in rows) if rows else 0
-    for r in rows:
-        if len(r) < width:
-            r.extend([""] * (width - len(r)))
-    if not header or not has_header:
+    rows = [r + [""] * (width - len(r)) if len(r) < width else r for r in rows]
+    header = rows[0] if rows and has_header else []
+    if not header:
         header = [f"col_{i+1}" for i in range(width)]
-    return header, rows[1:] if has_header else rows, dialect, has_header
+    return header, rows[1:] if has_header else rows
+
+def sample_column_values(path: str, encoding: str, max_rows: int,
+                         mode: str = "head", confidence: int = 0,
+                         profiles: Optional[Dict[int, ColumnProfile]] = None,
+                         timer: Optional[PhaseTimer] = None,
+                         ) -> Tuple[List[str], List[List[str]], csv.Dialect, bool]:
+    """
+    Read the first row and up to max_rows sample rows for detection.
+    mode is one of SAMPLE_MODES:
+    - head: the first max_rows rows
+    - reservoir: a uniform sample over the whole file (reads it all, keeps max_rows)
+    - spread: rows from evenly spaced byte offsets (seeks, never reads it all;
+      compressed files are read in full as for reservoir)
+    If a profiles dict is given, it is filled with the sampled data rows for
+    decide_columns; in head mode, reading stops early once every column is
+    settled at `confidence` (see ColumnProfile.settled). The "sniff" and
+    "sample" phases are timed in timer, if given.
+    """
+    timer = timer or PhaseTimer()
+    compressed = compression_of(path) is not None
+    with timer.phase("sniff"), (open_binary(path) if compressed else open_mapped(path)) as source:
+        dialect, has_header = sniff_bytes(source.read(SNIFF_BYTES) if compressed
+                                          else read_at(source, 0, SNIFF_BYTES))
+    with timer.phase("sample"), open_text(path, encoding) as f:
+        reader = csv.reader(f, dialect)
+        if mode == "head":
+            rows = _read_head(reader, max_rows, has_header, confidence, profiles)
+        else:
+            first = next(reader, None)
+            rows = [first] if first is not None else []
+            if rows and mode == "spread" and not compressed and os.path.getsize(path) > SPREAD_CHUNK_BYTES:
+                rows.extend(_sample_spread(path, encoding, dialect, len(first), max_rows))
+            elif rows:
+                # reservoir, or spread on a file that is small or compressed (can't seek)
+                rows.extend(_sample_reservoir(reader, max_rows))
+    if not rows:
+        return [], [], dialect, True
+    if profiles is not None and mode != "head":
+        limit = max_rows + 1
+        if not has_header:
+            profile_row(profiles, rows[0], confidence, limit)
+        for r in rows[1:]:
+            profile_row(profiles, r, confidence, limit)
+    header, data = _sample_view(rows, has_header)
+    return header, data, dialect, has_header
+
+class _HeadReplay(io.RawIOBase):
+    """Raw stream returning the already-read bytes `head`, then the rest of `stream`."""
+
+    def __init__(self, head: bytes, stream):
+        self._head = memoryview(head)
+        self._stream = stream
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        if self._head:
+            n = min(len(b), len(self._head))
+            b[:n] = self._head[:n]
+            self._head = self._head[n:]
+            return n
+        data = self._stream.read1(len(b)) if hasattr(self._stream, "read1") else self._stream.read(len(b))
+        b[:len(data)] = data
+        return len(data)
+
+def open_stdin(encoding: str, threaded: bool = False):
+    """
+    Sniff standard input without seeking: the first SNIFF_BYTES are held and
+    replayed in front of the rest of the stream. Compressed input is recognised
+    by its magic bytes and decompressed in a background thread; with threaded,
+    uncompressed input is read in one too.
+    Returns (text stream, dialect, has_header).
+    """
+    stream = sys.stdin.buffer
+    if threaded:
+        stream = io.BufferedReader(_ThreadedReader(stream), CODEC_CHUNK_BYTES)
+    head = stream.read(SNIFF_BYTES)
+    codec = _magic_codec(head)
+    if codec is not None:
+        compressed = _codec_open(codec, io.BufferedReader(_HeadReplay(head, stream)), "rb")
+        stream = io.BufferedReader(_ThreadedReader(compressed), CODEC_CHUNK_BYTES)
+        head = stream.read(SNIFF_BYTES)
+    dialect, has_header = sniff_bytes(head)
+    text = io.TextIOWrapper(io.BufferedReader(_HeadReplay(head, stream)),
+                            encoding=encoding, errors="replace", newline="")
+    return text, dialect, has_header
+
+def collect_samples(rows: List[List[str]]) -> Dict[int, List[str]]:
+    col_samples: Dict[int, List[str]] = defaultdict(list)
+    for r in rows:
+        for i, v in enumerate(r):
+            if v and v.strip():
+                col_samples[i].append(v.strip())
+    return col_samples
 
 def decide_columns(header: List[str],
                    rows: List[List[str]],
                    no_prompt: bool,
                    assume_order: Optional[str],
-                   force_order: Optional[str]) -> Dict[int, Optional[str]]:
+                   force_order: Optional[str],
+                   confidence: int = 0,
+                   profiles: Optional[Dict[int, ColumnProfile]] = None,
+                   serial_kinds=(),
+                   serial_columns: Optional[Dict[str, str]] = None) -> Dict[int, Optional[str]]:
     """
     Return mapping column_index -> chosen order ('DMY'/'MDY'/'YMD') or None to skip.
     - If force_order is set, apply that to every date-like column.
     - Otherwise infer; if ambiguous:
         * if no_prompt: use assume_order (or YMD), else prompt.
+    Columns that aren't date-like get one of serial_kinds if detect_serial
+    finds it; serial_columns maps column names to a SERIAL_KINDS member to
+    use regardless, warning about names not in header. With confidence > 0,
+    a column stops taking samples once settled (see ColumnProfile.settled).
+    profiles, if given, were already built from rows.
     """
-    col_samples: Dict[int, List[str]] = defaultdict(list)
-    for r in rows:
-        for i, v in enumerate(r):
-            if v and v.strip():
-                col_samples[i].append(v.strip())
+    if profiles is None:
+        profiles = {}
+        for r in rows:
+            if profile_row(profiles, r, confidence, len(rows)):
+                break
+
+    for name in serial_columns or {}:
+        if name not in header:
+            print(f"Warning: --serial-column {name}: there is no such column; "
+                  f"columns are: {', '.join(header)}")
 
     decisions: Dict[int, Optional[str]] = {}
     for i, name in enumerate(header):
-        samples = col_samples.get(i, [])
-        if not samples:
+        if serial_columns and name in serial_columns:
+            decisions[i] = serial_columns[name]
+            continue
+        profile = profiles.get(i)
+        if profile is None or not profile.samples:
             continue
-        if not column_is_date(samples):
+        samples = profile.samples
+        if not profile.is_date():
+            kind = detect_serial(samples, serial_kinds)
+            if kind is not None:
+                decisions[i] = kind
             continue
 
         if force_order:
             decisions[i] = force_order
             continue
 
-        order, _ = infer_order(samples)
+        order = profile.order()
         if order is None:
             # try counts to pick a best
-            parsed = {
-                "YMD": sum(1 for s in samples if try_parse(s, "YMD") is not None),
-                "DMY": sum(1 for s in samples if try_parse(s, "DMY") is not None),
-                "MDY": sum(1 for s in samples if try_parse(s, "MDY") is not None),
-            }
+            parsed = profile.parsed_counts()
             best = max(parsed.items(), key=lambda kv: kv[1])
             counts_sorted = sorted(parsed.values(), reverse=True)
             ambiguous = len(samples) > 0 and counts_sorted[1] >= 0.9 * counts_sorted[0]
@@ -224,76 +1364,1505 @@ def decide_columns(header: List[str],
             decisions[i] = order
     return decisions
 
+def decide_formats(rows: List[List[str]], decisions: Dict[int, Optional[str]]) -> Dict[int, str]:
+    """Return mapping column_index -> format template for decided columns that have one."""
+    col_samples = collect_samples(rows)
+    formats: Dict[int, str] = {}
+    for i, order in decisions.items():
+        if order is None or order in SERIAL_KINDS:
+            continue
+        fmt = infer_format(col_samples.get(i, []), order)
+        if fmt and compile_format(fmt, order):
+            formats[i] = fmt
+    return formats
+
 def format_iso(dt: datetime) -> str:
+    """
+    ISO-8601 form of a parsed value: see iso_from_fields. Offsets that aren't
+    whole minutes keep datetime.isoformat's seconds.
+    """
+    offset = None
     if dt.tzinfo:
-        return dt.isoformat()
-    if dt.hour == 0 and dt.minute == 0 and dt.second == 0 and dt.microsecond == 0:
-        return dt.date().isoformat()
-    s = dt.isoformat()
-    if s.endswith(".000000"):
-        s = s[:-7]
-    return s
+        delta = dt.utcoffset()
+        if delta is None or delta.seconds % 60 or delta.microseconds:
+            return dt.isoformat()
+        offset = (delta.days * 86400 + delta.seconds) // 60
+    return iso_from_fields(dt.year, dt.month, dt.day, dt.hour, dt.minute, dt.second, dt.microsecond, offset)
+
+def is_iso_output(s: str, order: str) -> bool:
+    """
+    Whether s is already exactly what convert_value gives for it under order:
+    YYYY-MM-DD, or YYYY-MM-DDTHH:MM:SS not at midnight (which would become
+    date-only), with valid fields. A fixed-width check, no regex or parsing.
+    Under DMY, a day that could be a month is read as one (2024-01-05 ->
+    2024-05-01), so such values are not skipped.
+    """
+    n = len(s)
+    if n != 10 and n != 19:
+        return False
+    if s[4] != "-" or s[7] != "-" or s[0] == "0" or not s.isascii():
+        return False
+    y, m, d = s[:4], s[5:7], s[8:10]
+    if not (y.isdigit() and m.isdigit() and d.isdigit()):
+        return False
+    year, month, day = int(y), int(m), int(d)
+    if not 1 <= month <= 12 or day < 1 or day > _DAYS_IN_MONTH[month]:
+        if month != 2 or day != 29 or not (year % 4 == 0 and (year % 100 != 0 or year % 400 == 0)):
+            return False
+    if order == "DMY" and day <= 12 and day != month:
+        return False
+    if n == 10:
+        return True
+    if s[10] != "T" or s[13] != ":" or s[16] != ":":
+        return False
+    hh, mm, ss = s[11:13], s[14:16], s[17:19]
+    if not (hh.isdigit() and mm.isdigit() and ss.isdigit()):
+        return False
+    return int(hh) < 24 and int(mm) < 60 and int(ss) < 60 and (hh, mm, ss) != ("00", "00", "00")
+
+# Numeric date columns (opt-in, see detect_serial): Excel serial days since
+# 1899-12-30 and Unix epoch seconds or milliseconds, optionally with a fraction
+SERIAL_KINDS = ("EXCEL", "EPOCH_S", "EPOCH_MS")
+SERIAL_RE = re.compile(r"^\s*(\d+)(?:\.(\d+))?\s*$")
+# value ranges a column's samples must fall in to be detected as each kind:
+# Excel serials for 1950-2100, epoch seconds and milliseconds for 1980-2100
+SERIAL_RANGES = {
+    "EXCEL": (18264, 73051),
+    "EPOCH_S": (315532800, 4102444800),
+    "EPOCH_MS": (315532800000, 4102444800000),
+}
+SERIAL_MIN_SHARE = 0.9
+_EXCEL_ORDINAL = date(1899, 12, 30).toordinal()
+_UNIX_ORDINAL = date(1970, 1, 1).toordinal()
+_MAX_ORDINAL = date.max.toordinal()
+
+def serial_kind(s: str) -> Optional[str]:
+    """The SERIAL_KINDS member whose detection range s falls in, if any."""
+    m = SERIAL_RE.match(s)
+    if m is None:
+        return None
+    n = int(m.group(1))
+    for kind, (lo, hi) in SERIAL_RANGES.items():
+        if lo <= n <= hi:
+            return kind
+    return None
+
+@lru_cache(maxsize=1 << 16)
+def _ordinal_ymd(ordinal: int) -> Tuple[int, int, int]:
+    d = date.fromordinal(ordinal)
+    return d.year, d.month, d.day
+
+def convert_serial(val: str, kind: str) -> Tuple[Optional[str], str]:
+    """
+    ISO-8601 form of an Excel serial or epoch value and the parse_value
+    outcome, from integer arithmetic on the value (see iso_from_fields).
+    Excel serials give local dates, with the fraction of a day rounded to
+    the second; epoch values give UTC timestamps.
+    """
+    whole, _, frac = val.strip().partition(".")
+    if not (whole.isdigit() and whole.isascii()) or (frac and not (frac.isdigit() and frac.isascii())):
+        return None, PARSE_FAILED
+    if kind == "EXCEL":
+        days = int(whole)
+        secs = 0
+        if frac:
+            scale = 10 ** len(frac)
+            secs = (int(frac) * 86400 * 2 + scale) // (2 * scale)
+            if secs == 86400:
+                days, secs = days + 1, 0
+        # serials below 61 count Excel's nonexistent 1900-02-29
+        ordinal = _EXCEL_ORDINAL + days
+        if days < 61 or ordinal > _MAX_ORDINAL:
+            return None, PARSE_FAILED
+        hour, rem = divmod(secs, 3600)
+        minute, second = divmod(rem, 60)
+        return iso_from_fields(*_ordinal_ymd(ordinal), hour, minute, second), PARSED_ORDER
+    if kind == "EPOCH_MS":
+        secs, ms = divmod(int(whole), 1000)
+        micro = ms * 1000 + (int(frac[:3].ljust(3, "0")) if frac else 0)
+    else:
+        secs = int(whole)
+        micro = int(frac[:6].ljust(6, "0")) if frac else 0
+    days, secs = divmod(secs, 86400)
+    ordinal = _UNIX_ORDINAL + days
+    if ordinal > _MAX_ORDINAL:
+        return None, PARSE_FAILED
+    hour, rem = divmod(secs, 3600)
+    minute, second = divmod(rem, 60)
+    return iso_from_fields(*_ordinal_ymd(ordinal), hour, minute, second, micro, 0), PARSED_ORDER
+
+def detect_serial(samples: List[str], kinds) -> Optional[str]:
+    """
+    The one of kinds (SERIAL_KINDS members) that at least SERIAL_MIN_SHARE of
+    a column's samples fall in the range of, if any.
+    """
+    if not samples or not kinds:
+        return None
+    kind, n = Counter(serial_kind(s) for s in samples).most_common(1)[0]
+    if kind in kinds and n >= SERIAL_MIN_SHARE * len(samples):
+        return kind
+    return None
+
+def convert_value(val: str, order: str,
+                  parse: Optional[Callable[[str], Optional[str]]] = None) -> Tuple[Optional[str], str]:
+    """
+    ISO-8601 form of one cell (None if it can't be parsed) and the parse_value
+    outcome; parse is a compile_format(..., build=_build_iso) function.
+    """
+    return parse_value(val, order, parse, build=_build_iso)
+
+class LRUCache:
+    """Bounded mapping with least-recently-used eviction and hit/miss counters."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.data: "OrderedDict[Tuple[str, str], Tuple[Optional[str], str]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Tuple[str, str], default=None):
+        try:
+            value = self.data[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        self.data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key: Tuple[str, str], value: Tuple[Optional[str], str]) -> None:
+        self.data[key] = value
+        self.data.move_to_end(key)
+        if len(self.data) > self.maxsize:
+            self.data.popitem(last=False)
+
+# per-column intern tables: once a table holds INTERN_PROBE values, and at each
+# doubling after, it is dropped if more than INTERN_MAX_MISS_SHARE of its
+# lookups were new values; at INTERN_MAX_VALUES it stops growing
+INTERN_PROBE = 4096
+INTERN_MAX_VALUES = 1 << 16
+INTERN_MAX_MISS_SHARE = 0.5
+
+class InternTable:
+    """
+    One column's raw value -> (iso, outcome) table, built as the file streams.
+    Lookups are not counted here: every non-blank cell of the column is one,
+    so they are the column's outcome count (`counts`) and a hit costs a dict
+    lookup only. A high-cardinality column's table is dropped (see
+    INTERN_PROBE).
+    """
+
+    def __init__(self, counts: Counter):
+        self.data: Dict[str, Tuple[Optional[str], str]] = {}
+        self.counts = counts
+        self.misses = 0
+        self.dropped_at: Optional[Tuple[int, int]] = None  # (lookups, values) when dropped
+
+    def add(self, val: str, result: Tuple[Optional[str], str]) -> bool:
+        """Record a miss and its result; False if the table has just been dropped."""
+        self.misses += 1
+        n = len(self.data)
+        if n >= INTERN_MAX_VALUES:
+            return True
+        self.data[val] = result
+        n += 1
+        if n >= INTERN_PROBE and n & (n - 1) == 0:
+            lookups = sum(self.counts.values()) + 1  # this cell's outcome isn't counted yet
+            if self.misses > lookups * INTERN_MAX_MISS_SHARE:
+                self.dropped_at = (lookups, n)
+                self.data = {}
+                return False
+        return True
+
+    def report(self) -> Counter:
+        """lookups, hits, values and dropped (0/1), summable over the parts of a --jobs run."""
+        lookups, values = self.dropped_at or (sum(self.counts.values()), len(self.data))
+        return Counter(lookups=lookups, hits=lookups - self.misses, values=values,
+                       dropped=self.dropped_at is not None, tables=1)
+
+_MISSING = object()
+
+class RowConverter:
+    """
+    Converts the decided date columns of each data row, padding short rows to
+    `width`, and counts parse_value outcomes per column in `stats`. With
+    intern, each column remembers its values' conversions in an InternTable.
+    """
+
+    # what the column parsers build (see parse_value): ISO strings directly
+    build = staticmethod(_build_iso)
+
+    def __init__(self, decisions: Dict[int, Optional[str]], formats: Dict[int, str],
+                 width: int, cache_size: int = 0, intern: bool = True):
+        self.parsers = {i: compile_format(fmt, decisions[i], self.build) for i, fmt in formats.items()}
+        self.columns = [(i, order, self._cell_converter(i, order))
+                        for i, order in decisions.items() if order]
+        self.width = width
+        self.cache = LRUCache(cache_size) if cache_size > 0 else None
+        self.stats: Dict[int, Counter] = {i: Counter() for i, _, _ in self.columns}
+        self.interns = {i: InternTable(self.stats[i]) for i, _, _ in self.columns} if intern else {}
+        self._tables = {i: self.interns[i].data if intern else None for i, _, _ in self.columns}
+
+    def _cell_converter(self, idx: int, order: str) -> Callable[[str], Tuple[Optional[str], str]]:
+        """convert_value (convert_serial for SERIAL_KINDS) for one column's cells."""
+        if order in SERIAL_KINDS:
+            return lambda val: convert_serial(val, order)
+        parse = self.parsers.get(idx)
+        return lambda val: convert_value(val, order, parse)
+
+    def convert(self, row: List[str]) -> List[str]:
+        out = self.changes(row)
+        return row if out is None else out
+
+    def changes(self, row: List[str]) -> Optional[List[str]]:
+        """The converted row, or None if it needs neither padding nor any cell changed."""
+        out = None
+        if len(row) < self.width:
+            # a padded copy: the caller's row is left as it is
+            row = out = row + [""] * (self.width - len(row))
+        tables = self._tables
+        for idx, order, convert in self.columns:
+            val = row[idx]
+            if not val or not val.strip():
+                continue
+            table = tables[idx]
+            hit = table.get(val) if table is not None else None
+            if hit is None:
+                hit = self._convert_cell(val, order, convert)
+                if table is not None and not self.interns[idx].add(val, hit):
+                    tables[idx] = None
+            iso, outcome = hit
+            self.stats[idx][outcome] += 1
+            if iso is not None and iso != val:
+                if out is None:
+                    out = list(row)
+                out[idx] = iso
+        return out
+
+    def _convert_cell(self, val: str, order: str, convert) -> Tuple[Optional[str], str]:
+        if is_iso_output(val, order):
+            return None, ISO_SKIPPED
+        cache = self.cache
+        if cache is None:
+            return convert(val)
+        hit = cache.get((val, order), _MISSING)
+        if hit is _MISSING:
+            hit = convert(val)
+            cache.put((val, order), hit)
+        return hit
+
+    def intern_report(self) -> Dict[int, Counter]:
+        """InternTable.report per column (empty without intern)."""
+        return {i: table.report() for i, table in self.interns.items()}
+
+class ProfilingRowConverter(RowConverter):
+    """RowConverter that also times parsing and formatting and counts parse methods per column."""
+
+    # parse to datetimes, so that formatting can be timed apart
+    build = staticmethod(_build_datetime)
+
+    def __init__(self, *args, **kwargs):
+        self.times: Dict[int, Counter] = {}
+        self.methods: Dict[int, Counter] = {}
+        super().__init__(*args, **kwargs)
+
+    def _cell_converter(self, idx: int, order: str) -> Callable[[str], Tuple[Optional[str], str]]:
+        times = self.times[idx] = Counter()
+        methods = self.methods[idx] = Counter()
+        parse = self.parsers.get(idx)
+        clock = time.perf_counter
+        if order in SERIAL_KINDS:
+            def convert_serial_timed(val: str) -> Tuple[Optional[str], str]:
+                t0 = clock()
+                result = convert_serial(val, order)
+                times["parse"] += clock() - t0
+                methods[METHOD_SERIAL] += 1
+                return result
+            return convert_serial_timed
+
+        def convert(val: str) -> Tuple[Optional[str], str]:
+            t0 = clock()
+            dt, outcome = parse_value(val, order, parse, methods)
+            t1 = clock()
+            iso = format_iso(dt) if dt is not None else None
+            times["parse"] += t1 - t0
+            times["format"] += clock() - t1
+            return iso, outcome
+        return convert
+
+def _convert_rows_profiled(items, fout, writer, converter: RowConverter, timer: PhaseTimer,
+                           passthrough: bool) -> None:
+    """
+    The conversion loop of convert_file, timing csv reading, conversion and
+    writing separately. items are rows, or (row, raw) records with passthrough.
+    """
+    clock = time.perf_counter
+    loop = timer.loop
+    it = iter(items)
+    while True:
+        t0 = clock()
+        item = next(it, None)
+        t1 = clock()
+        if item is None:
+            break
+        if passthrough:
+            row, raw = item
+            out = converter.changes(row)
+            t2 = clock()
+            if out is None:
+                fout.write(raw)
+            else:
+                writer.writerow(out)
+        else:
+            out = converter.convert(item)
+            t2 = clock()
+            writer.writerow(out)
+        t3 = clock()
+        loop["read csv"] += t1 - t0
+        loop["convert"] += t2 - t1
+        loop["write"] += t3 - t2
+        timer.rows += 1
+
+def print_profile(timer: PhaseTimer, header: List[str], converter: Optional[RowConverter],
+                  input_bytes: Optional[int]) -> None:
+    print("Profile:")
+    total_wall = sum(w for _, w, _ in timer.phases)
+    total_cpu = sum(c for _, _, c in timer.phases)
+    for name, wall, cpu in timer.phases + [("total", total_wall, total_cpu)]:
+        print(f"  {name:<10} {wall:8.3f}s wall {cpu:8.3f}s cpu")
+    convert_wall = sum(w for name, w, _ in timer.phases if name == "convert")
+    if timer.rows and convert_wall > 0:
+        rate = f"  {timer.rows / convert_wall:,.0f} rows/s"
+        if input_bytes:
+            rate += f", {input_bytes / convert_wall / 1e6:.1f} MB/s"
+        print(rate + " (convert phase)")
+    if timer.loop:
+        print("  conversion loop: " + ", ".join(f"{k} {v:.3f}s" for k, v in timer.loop.items()))
+    if isinstance(converter, ProfilingRowConverter):
+        print("  per column:")
+        for idx, _, _ in converter.columns:
+            times, methods, counts = converter.times[idx], converter.methods[idx], converter.stats[idx]
+            parsed = sum(counts.values()) - counts[ISO_SKIPPED]
+            cached = parsed - sum(methods.values())
+            print(f"    - {header[idx]}: parse {times['parse']:.3f}s, format {times['format']:.3f}s; "
+                  f"{methods[METHOD_TEMPLATE]} template, {methods[METHOD_NUMERIC]} numeric, "
+                  f"{methods[METHOD_MONTH_NAME]} month name, {methods[METHOD_DATEUTIL]} dateutil, "
+                  f"{methods[METHOD_SERIAL]} serial, {cached} cached, {counts[ISO_SKIPPED]} already ISO; "
+                  f"{counts[PARSED_FALLBACK]} fallback, {counts[PARSE_FAILED]} failed")
+
+class RecordReader:
+    """
+    csv.reader over f that also keeps the original text of the record it
+    returned last in `raw`, line endings included, for --passthrough.
+    """
+
+    def __init__(self, f, dialect="excel", **fmtparams):
+        self._lines: List[str] = []
+        self._reader = csv.reader(self._tap(f), dialect, **fmtparams)
+        self.raw = ""
+        # if a list, the raw text of every record read is appended to it
+        self.kept: Optional[List[str]] = None
+
+    def _tap(self, f):
+        for line in f:
+            self._lines.append(line)
+            yield line
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> List[str]:
+        row = next(self._reader)
+        self.raw = "".join(self._lines)
+        self._lines.clear()
+        if self.kept is not None:
+            self.kept.append(self.raw)
+        return row
+
+    def records(self):
+        """Iterate (row, raw) pairs."""
+        for row in self:
+            yield row, self.raw
+
+def line_ending(raw: str) -> Optional[str]:
+    for end in ("\r\n", "\n", "\r"):
+        if raw.endswith(end):
+            return end
+    return None
+
+def write_passthrough(records, fout, writer, converter: RowConverter) -> None:
+    """
+    Write (row, raw) records: as their original text when converting leaves
+    them unchanged, else re-serialised by writer.
+    """
+    for row, raw in records:
+        out = converter.changes(row)
+        if out is None:
+            fout.write(raw)
+        else:
+            writer.writerow(out)
+
+DIALECT_PARAMS = ("delimiter", "quotechar", "escapechar", "doublequote",
+                  "skipinitialspace", "lineterminator", "quoting")
+
+def dialect_params(dialect) -> Dict[str, object]:
+    """Plain csv format parameters of a dialect, e.g. to pass to another process."""
+    return {k: getattr(dialect, k) for k in DIALECT_PARAMS}
+
+SCHEMA_VERSION = 1
+
+def header_hash(header: List[str]) -> str:
+    import hashlib
+    return hashlib.sha1("\x1f".join(header).encode("utf-8")).hexdigest()[:16]
+
+def save_schema(path: str, dialect, has_header: bool, header: List[str],
+                decisions: Dict[int, Optional[str]], formats: Dict[int, str]) -> None:
+    """Write the detection results to a JSON schema file for --schema."""
+    import json
+    schema = {
+        "version": SCHEMA_VERSION,
+        "dialect": dialect_params(dialect),
+        "has_header": has_header,
+        "header": header,
+        "header_hash": header_hash(header),
+        "columns": [{"index": i, "name": header[i], "order": order, "format": formats.get(i)}
+                    for i, order in decisions.items()],
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(schema, f, indent=2)
+        f.write("\n")
+
+def load_schema(path: str):
+    """
+    Read a --save-schema file. Returns (dialect, has_header, header,
+    decisions, formats) as detection would have produced them.
+    """
+    import json
+    with open(path, "r", encoding="utf-8") as f:
+        schema = json.load(f)
+    if schema.get("version") != SCHEMA_VERSION:
+        raise ValueError(f"{path}: unsupported schema version {schema.get('version')!r}")
+    dialect = type("SchemaDialect", (csv.Dialect,), schema["dialect"])
+    decisions = {c["index"]: c["order"] for c in schema["columns"]}
+    formats = {c["index"]: c["format"] for c in schema["columns"] if c["format"]}
+    return dialect, schema["has_header"], schema["header"], decisions, formats
+
+# --jobs: inputs are split into about this many bytes per worker at least
+MIN_JOB_BYTES = 1 << 20
+
+def _quoted_field_re(dialect) -> "re.Pattern[bytes]":
+    """
+    Regex over bytes for a quoted field as csv.reader reads it under dialect:
+    a quote character starting a field, up to its closing quote or the end of
+    the bytes. It doesn't match quotes inside unquoted fields, which csv.reader
+    keeps as text. With skipinitialspace, a match after a space still has to
+    be checked for a delimiter or line break before the spaces.
+    """
+    quote = re.escape(dialect.quotechar.encode("ascii"))
+    delimiter = re.escape(dialect.delimiter.encode("ascii"))
+    space = b" " if dialect.skipinitialspace else b""
+    body = b"[^%s]*(?:%s%s[^%s]*)*" % (quote, quote, quote, quote) if dialect.doublequote else b"[^%s]*" % quote
+    return re.compile(rb"%s(?<![^%s\r\n%s]%s)%s(?:%s|\Z)" % (quote, delimiter, space, quote, body, quote))
+
+def split_records(path: str, parts: int, dialect, block_size: int = 1 << 22) -> List[int]:
+    """
+    Byte offsets [0, ..., size] cutting the file into about `parts` ranges of
+    whole records as csv.reader reads them under dialect, so quoted fields
+    with embedded newlines stay intact (the dialect must have no escape
+    character, see _can_split). That takes a scan for quoted fields up to the
+    last cut, over the file's mapping; without a quote character only the
+    bytes after each target offset are looked at.
+    """
+    size = os.path.getsize(path)
+    targets = [size * k // parts for k in range(1, parts)]
+    bounds = [0]
+    if dialect.quoting == csv.QUOTE_NONE or not dialect.quotechar:
+        with open_mapped(path) as source:
+            for target in targets:
+                if target < bounds[-1]:
+                    continue
+                nl = _find_newline(source, target, block_size)
+                if nl == -1:
+                    break
+                if nl + 1 < size:
+                    bounds.append(nl + 1)
+        bounds.append(size)
+        return bounds
+    quoted_field = _quoted_field_re(dialect)
+    starts = (dialect.delimiter.encode("ascii"), b"\r", b"\n")
+    with open_mapped(path, sequential=True) as source:
+        pos = 0  # always a record start
+        want = block_size
+        while targets:
+            block = read_at(source, pos, want)
+            if not block:
+                break
+            at_end = pos + len(block) >= size
+            start = find = 0  # the unquoted stretch being scanned, and where to look for the next quote
+            resume = 0  # the last record start seen in the block
+            while True:
+                m = quoted_field.search(block, find)
+                if m is not None and block[m.start() - 1:m.start()] == b" ":
+                    j = m.start() - 1
+                    while j > 0 and block[j - 1:j] == b" ":
+                        j -= 1
+                    if j > 0 and block[j - 1:j] not in starts:
+                        find = m.start() + 1  # a quote inside an unquoted field
+                        continue
+                stop = m.start() if m is not None else len(block)
+                while targets and targets[0] < pos + stop:
+                    nl = block.find(b"\n", max(targets[0] - pos, start), stop)
+                    if nl == -1:
+                        break
+                    bound = pos + nl + 1
+                    if bound < size:
+                        bounds.append(bound)
+                    while targets and targets[0] < bound:
+                        targets.pop(0)
+                nl = block.rfind(b"\n", start, stop)
+                if nl != -1:
+                    resume = nl + 1
+                if m is None or (m.end() == len(block) and not at_end):
+                    break  # the block ends inside (or maybe just after) a quoted field
+                start = find = m.end()
+            if at_end:
+                break
+            if resume:
+                pos += resume
+                want = block_size
+            else:
+                want *= 2  # no record ends in the block: read a longer one
+    bounds.append(size)
+    return bounds
+
+def _find_newline(source, start: int, block_size: int) -> int:
+    """Offset of the first newline at or after start in a source from open_mapped, or -1."""
+    import mmap
+    if isinstance(source, mmap.mmap):
+        return source.find(b"\n", start)
+    pos = start
+    while block := read_at(source, pos, block_size):
+        nl = block.find(b"\n")
+        if nl != -1:
+            return pos + nl
+        pos += len(block)
+    return -1
+
+class _ByteRange(io.RawIOBase):
+    """Read-only view of bytes [start, end) of a file, copied straight out of its mapping (see open_mapped)."""
+
+    def __init__(self, path: str, start: int, end: int):
+        self._stack = contextlib.ExitStack()
+        self._source = self._stack.enter_context(open_mapped(path, sequential=True))
+        self._pos = start
+        self._left = end - start
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        n = min(len(b), self._left)
+        if n <= 0:
+            return 0
+        if not isinstance(self._source, io.IOBase):  # a mapping, see open_mapped
+            with memoryview(self._source) as view:
+                memoryview(b)[:n] = view[self._pos:self._pos + n]
+        else:
+            n = len(data := read_at(self._source, self._pos, n))
+            memoryview(b)[:n] = data
+        self._pos += n
+        self._left -= n
+        return n
+
+    def close(self) -> None:
+        self._stack.close()
+        super().close()
+
+def _convert_range(task: Dict[str, object]) -> Tuple[Dict[int, Counter], int, int, Dict[int, Counter]]:
+    """
+    Worker for --jobs: convert the records in one byte range of the input into
+    a part file. The range starting at 0 holds the first row, copied unchanged.
+    With a "terminator", unchanged records are copied as is (--passthrough).
+    Returns the outcome counts, the cache hits and misses and the intern
+    table reports.
+    """
+    params = task["dialect"]
+    terminator = task["terminator"]
+    converter = RowConverter(task["decisions"], task["formats"], task["width"], task["cache_size"],
+                             task["intern"])
+    raw = _ByteRange(task["input"], task["start"], task["end"])
+    with io.TextIOWrapper(io.BufferedReader(raw), encoding=task["encoding"], errors="replace", newline="") as fin, \
+         open(task["part"], "w", newline="", encoding=task["part_encoding"]) as fout:
+        if terminator is not None:
+            records = RecordReader(fin, **params).records()
+            writer = csv.writer(fout, **dict(params, lineterminator=terminator))
+            if task["start"] == 0:
+                for _, raw in islice(records, 1):
+                    fout.write(raw)
+            write_passthrough(records, fout, writer, converter)
+        else:
+            reader = csv.reader(fin, **params)
+            writer = csv.writer(fout, **params)
+            if task["start"] == 0:
+                first_row = next(reader, None)
+                if first_row is not None:
+                    writer.writerow(first_row)
+            for row in reader:
+                writer.writerow(converter.convert(row))
+    cache = converter.cache
+    return (converter.stats, (cache.hits if cache else 0), (cache.misses if cache else 0),
+            converter.intern_report())
+
+def _can_split(encoding: str, dialect) -> bool:
+    """Byte-range splitting needs single-byte newlines, ASCII quotes and delimiters, and no escape character."""
+    try:
+        name = codecs.lookup(encoding).name
+    except LookupError:
+        return False
+    # utf-8-sig only adds a BOM in front of the first part (see _convert_parallel)
+    ascii_newline = "\n\"".encode("utf-8" if name == "utf-8-sig" else name) == b"\n\""
+    return ascii_newline and (dialect.delimiter + (dialect.quotechar or "")).isascii() \
+        and not getattr(dialect, "escapechar", None)
+
+def _convert_parallel(input_path: str, fout, tmp_dir: Optional[str], encoding: str, dialect,
+                      decisions: Dict[int, Optional[str]], formats: Dict[int, str],
+                      width: int, cache_size: int, bounds: List[int],
+                      terminator: Optional[str] = None, intern: bool = True,
+                      ) -> Tuple[Dict[int, Counter], int, int, Dict[int, Counter]]:
+    """Run _convert_range over each byte range and copy the parts, in order, to the binary file fout."""
+    # imported on use: only --jobs needs them, and multiprocessing is slow to import
+    import shutil
+    import tempfile
+    from concurrent.futures import ProcessPoolExecutor
+    params = dialect_params(dialect)
+    # continuation parts must not repeat a byte order mark
+    tail_encoding = "utf-8" if codecs.lookup(encoding).name == "utf-8-sig" else encoding
+    tasks = []
+    for k, (start, end) in enumerate(zip(bounds, bounds[1:])):
+        fd_, part = tempfile.mkstemp(prefix=".fix_dates_", suffix=f".part{k}", dir=tmp_dir)
+        os.close(fd_)
+        tasks.append({"input": input_path, "start": start, "end": end, "part": part,
+                      "encoding": encoding, "part_encoding": encoding if k == 0 else tail_encoding,
+                      "dialect": params, "decisions": decisions, "formats": formats,
+                      "width": width, "cache_size": cache_size, "terminator": terminator, "intern": intern})
+    stats: Dict[int, Counter] = {i: Counter() for i, order in decisions.items() if order}
+    interns: Dict[int, Counter] = defaultdict(Counter)
+    hits = misses = 0
+    try:
+        with ProcessPoolExecutor(max_workers=len(tasks)) as pool:
+            for part_stats, h, m, part_interns in pool.map(_convert_range, tasks):
+                for i, counts in part_stats.items():
+                    stats[i].update(counts)
+                for i, counts in part_interns.items():
+                    interns[i].update(counts)
+                hits += h
+                misses += m
+        for task in tasks:
+            with open(task["part"], "rb") as fpart:
+                shutil.copyfileobj(fpart, fout, 1 << 20)
+    finally:
+        for task in tasks:
+            if os.path.exists(task["part"]):
+                os.remove(task["part"])
+    return stats, hits, misses, dict(interns)
+
 
 def convert_file(
     input_path: str,
     output_path: str,
     encoding: str = "utf-8",
     sample_rows: int = 200,
+    sample_mode: str = "head",
+    confidence: int = 0,
     no_prompt: bool = False,
     assume_order: Optional[str] = None,
     force_order: Optional[str] = None,
-):
-    header, sample_rows_data, dialect, has_header = sample_column_values(input_path, encoding, sample_rows)
+    cache_size: int = 0,
+    jobs: int = 1,
+    passthrough: bool = False,
+    schema: Optional[str] = None,
+    save_schema_path: Optional[str] = None,
+    profile: bool = False,
+    serial_kinds=(),
+    serial_columns: Optional[Dict[str, str]] = None,
+    pipeline: bool = False,
+    intern: bool = True,
+) -> Dict[int, Counter]:
+    """
+    Convert input_path to output_path (either may be "-" for stdin/stdout)
+    and return, per converted column index, a Counter of parse_value
+    outcomes. The options correspond to the command-line flags (see main);
+    when writing to stdout, status messages go to stderr.
+    """
+    timer = PhaseTimer()
+    with contextlib.ExitStack() as stack:
+        fout_bin = None
+        if output_path == STDIO:
+            fout_bin = sys.stdout.buffer
+            stack.callback(fout_bin.flush)
+            stack.enter_context(contextlib.redirect_stdout(sys.stderr))
+        if pipeline and profile:
+            print("Note: --profile times the conversion in one thread; ignoring --pipeline.")
+            pipeline = False
+        profiles: Dict[int, ColumnProfile] = {}
+        head: List[List[str]] = []
+        head_raw: List[str] = []
+        if schema is not None:
+            with timer.phase("schema"):
+                dialect, has_header, header, decisions, formats = load_schema(schema)
+            sample_rows = 0
+        if input_path == STDIO:
+            if sample_mode != "head" and schema is None:
+                print(f"Note: standard input can only be sampled from the head; ignoring --sample-mode {sample_mode}.")
+            with timer.phase("sniff"):
+                fin, sniffed, sniffed_header = open_stdin(encoding, threaded=pipeline)
+            stack.enter_context(fin)
+            if schema is None:
+                dialect, has_header = sniffed, sniffed_header
+            if passthrough:
+                reader = RecordReader(fin, dialect)
+                reader.kept = head_raw
+            else:
+                reader = csv.reader(fin, dialect)
+            with timer.phase("sample"):
+                head = _read_head(reader, sample_rows, has_header, confidence, profiles)
+            if schema is None:
+                header, sample_rows_data = _sample_view(head, has_header)
+        elif schema is None:
+            header, sample_rows_data, dialect, has_header = sample_column_values(
+                input_path, encoding, sample_rows, sample_mode, confidence, profiles, timer)
 
-    if not header:
-        print("Input appears empty. Nothing to do.")
+        if not header:
+            print("Input appears empty. Nothing to do.")
+            return {}
+
+        if schema is not None:
+            print(f"Using schema {schema}: delimiter='{dialect.delimiter}' quotechar='{dialect.quotechar}' header={has_header}")
+        else:
+            print(f"Detected delimiter='{dialect.delimiter}' quotechar='{getattr(dialect, 'quotechar', '\"')}' header={has_header}")
+            with timer.phase("detect"):
+                decisions = decide_columns(header, sample_rows_data, no_prompt, assume_order, force_order,
+                                           confidence, profiles, serial_kinds, serial_columns)
+                formats = decide_formats(sample_rows_data, decisions)
+        if not decisions:
+            print("No date-like columns detected. Copying input to output unchanged.")
+        else:
+            print("Date column decisions:")
+            for i, order in decisions.items():
+                if order and i in formats:
+                    print(f"  - {header[i]}: {order} ({formats[i]})")
+                elif order:
+                    print(f"  - {header[i]}: {order}")
+                else:
+                    print(f"  - {header[i]}: skipped")
+        if save_schema_path:
+            save_schema(save_schema_path, dialect, has_header, header, decisions, formats)
+            print(f"Saved schema: {save_schema_path}")
+
+        if input_path == STDIO:
+            # replay the sampled rows, then carry on with the stream
+            if passthrough:
+                reader.kept = None
+                records = chain(zip(head, head_raw), reader.records())
+            rows = chain(head, reader)
+            first_row = head[0] if head else None
+            first_raw = head_raw[0] if head_raw else ""
+        else:
+            with open_text(input_path, encoding) as fin:
+                first_reader = RecordReader(fin, dialect)
+                first_row = next(first_reader, None)
+                first_raw = first_reader.raw
+        width = len(first_row) if first_row is not None else 0
+        if schema is not None and first_row is not None:
+            seen = first_row if has_header else [f"col_{i+1}" for i in range(width)]
+            if header_hash(seen) != header_hash(header):
+                print(f"Warning: the input's {'header' if has_header else 'column count'} differs from "
+                      f"the schema's; columns may have moved. Re-run with --save-schema to update it.")
+        terminator = (line_ending(first_raw) or dialect.lineterminator) if passthrough else None
+
+        bounds: List[int] = []
+        if jobs > 1 and profile:
+            print("Note: --profile times the conversion in one process; ignoring --jobs.")
+        elif jobs > 1 and first_row is not None and input_path != STDIO:
+            if compression_of(input_path) is not None:
+                print("Note: --jobs can't split a compressed input; using one process.")
+            elif _can_split(encoding, dialect):
+                parts = min(jobs, max(1, os.path.getsize(input_path) // MIN_JOB_BYTES))
+                bounds = split_records(input_path, parts, dialect) if parts > 1 else []
+            else:
+                print("Note: --jobs needs an ASCII-compatible encoding and no escape character; using one process.")
+
+        with timer.phase("convert"):
+            if len(bounds) > 2:
+                if pipeline:
+                    print("Note: --pipeline runs in one process; ignoring it with --jobs.")
+                if fout_bin is None:
+                    fout_bin = stack.enter_context(open_binary(output_path, "wb"))
+                    tmp_dir = os.path.dirname(os.path.abspath(output_path))
+                else:
+                    tmp_dir = None
+                converter = None
+                stats, hits, misses, interns = _convert_parallel(input_path, fout_bin, tmp_dir, encoding,
+                                                                 dialect, decisions, formats, width,
+                                                                 cache_size, bounds, terminator, intern)
+            else:
+                converter = (ProfilingRowConverter if profile else RowConverter)(decisions, formats, width,
+                                                                                 cache_size, intern)
+                if input_path != STDIO:
+                    fin = stack.enter_context(open_text(input_path, encoding, threaded=pipeline))
+                    if passthrough:
+                        records = RecordReader(fin, dialect).records()
+                    else:
+                        rows = csv.reader(fin, dialect)
+                if pipeline:
+                    if fout_bin is None:
+                        fout_bin = stack.enter_context(open_binary(output_path, "wb"))
+                    fout = stack.enter_context(_PipelineWriter(fout_bin, encoding, dialect, terminator))
+                elif fout_bin is None and compression_of(output_path, check_magic=False) is None:
+                    fout = stack.enter_context(open(output_path, "w", newline="", encoding=encoding))
+                else:
+                    if fout_bin is None:
+                        fout_bin = stack.enter_context(open_binary(output_path, "wb"))
+                    fout = io.TextIOWrapper(fout_bin, encoding=encoding, newline="")
+                    # flush into stdout or the compressor, which close separately
+                    stack.callback(fout.detach)
+                    stack.callback(fout.flush)
+                if passthrough:
+                    writer = fout if pipeline else csv.writer(fout, dialect, lineterminator=terminator)
+                    first = next(records, None)
+                    if first is None:
+                        return converter.stats
+                    fout.write(first[1])
+                    if profile:
+                        _convert_rows_profiled(records, fout, writer, converter, timer, passthrough)
+                    else:
+                        write_passthrough(records, fout, writer, converter)
+                else:
+                    writer = fout if pipeline else csv.writer(fout, dialect)
+                    first_row = next(rows, None)
+                    if first_row is None:
+                        return converter.stats
+                    writer.writerow(first_row)
+                    if profile:
+                        _convert_rows_profiled(rows, fout, writer, converter, timer, passthrough)
+                    else:
+                        for row in rows:
+                            writer.writerow(converter.convert(row))
+                stats = converter.stats
+                interns = converter.intern_report()
+                hits = converter.cache.hits if converter.cache else 0
+                misses = converter.cache.misses if converter.cache else 0
+
+        if stats:
+            print("Parse outcomes:")
+            for i, counts in stats.items():
+                print(f"  - {header[i]}: {counts[ISO_SKIPPED]} already ISO, {counts[PARSED_ORDER]} as {decisions[i]}, "
+                      f"{counts[PARSED_FALLBACK]} fallback, {counts[PARSE_FAILED]} failed")
+            if any(counts[PARSE_FAILED] for counts in stats.values()) and dateutil_parser() is None:
+                print("Note: python-dateutil is not installed, so only numeric and month-name dates were "
+                      "converted; other layouts were left as they are. Install with: pip install python-dateutil")
+
+        if any(counts["lookups"] for counts in interns.values()):
+            print("Intern tables:")
+            for i, counts in interns.items():
+                rate = 100.0 * counts["hits"] / counts["lookups"] if counts["lookups"] else 0.0
+                line = f"  - {header[i]}: {rate:.1f}% hits over {counts['lookups']} values (table of {counts['values']})"
+                if counts["dropped"]:
+                    parts = f" in {counts['dropped']} of {counts['tables']} parts" if counts["tables"] > 1 else ""
+                    line += f", then dropped as high-cardinality{parts}"
+                print(line)
+
+        if cache_size > 0:
+            lookups = hits + misses
+            rate = 100.0 * hits / lookups if lookups else 0.0
+            print(f"Parse cache: {hits} hits, {misses} misses ({rate:.1f}% hit rate)")
+        if profile:
+            input_bytes = os.path.getsize(input_path) if input_path != STDIO else None
+            print_profile(timer, header, converter, input_bytes)
+        return stats
+
+class Detection:
+    """
+    Detection result for the library API: the CSV dialect (None if the rows
+    came already split), whether the first row is a header, the header (col_N
+    names without one), and per column index the chosen order (None: left
+    alone) and format template. The fields are in load_schema's order, so
+    Detection(*load_schema(path)) reuses a saved schema.
+    """
+
+    def __init__(self, dialect, has_header: bool, header: List[str],
+                 decisions: Dict[int, Optional[str]], formats: Dict[int, str]):
+        self.dialect = dialect
+        self.has_header = has_header
+        self.header = header
+        self.decisions = decisions
+        self.formats = formats
+
+    @property
+    def date_columns(self) -> Dict[str, str]:
+        """Column name -> order for the columns that will be converted."""
+        return {self.header[i]: order for i, order in self.decisions.items() if order}
+
+    def __repr__(self) -> str:
+        return f"Detection(has_header={self.has_header}, date_columns={self.date_columns})"
+
+def _detect_rows(rows: Iterator[List[str]], has_header: bool, dialect, sample_rows: int, confidence: int,
+                 assume_order: Optional[str], force_order: Optional[str],
+                 serial_kinds=()) -> Tuple[Detection, List[List[str]]]:
+    """Detect from the first rows of an iterator; also returns the rows it consumed."""
+    profiles: Dict[int, ColumnProfile] = {}
+    head = _read_head(rows, sample_rows, has_header, confidence, profiles)
+    header, data = _sample_view(head, has_header)
+    decisions = decide_columns(header, data, True, assume_order, force_order, confidence, profiles,
+                               serial_kinds)
+    formats = decide_formats(data, decisions)
+    return Detection(dialect, has_header, header, decisions, formats), head
+
+def detect(rows: Iterable[List[str]], has_header: bool = True, sample_rows: int = 200, confidence: int = 0,
+           assume_order: Optional[str] = None, force_order: Optional[str] = None,
+           serial_kinds=()) -> Detection:
+    """
+    Detect the date columns of already-split rows from the first sample_rows
+    of them, as convert_file does with --no-prompt: an ambiguous column gets
+    assume_order (or YMD), and numeric columns one of serial_kinds if they
+    fit it. Consumes that many rows of an iterator. To convert a column as
+    Excel serials or epochs regardless, set its entry in decisions.
+    """
+    return _detect_rows(iter(rows), has_header, None, sample_rows, confidence, assume_order, force_order,
+                        serial_kinds)[0]
+
+def convert_rows(rows: Iterable[List[str]], detection: Optional[Detection] = None, has_header: bool = True,
+                 sample_rows: int = 200, confidence: int = 0, assume_order: Optional[str] = None,
+                 force_order: Optional[str] = None, cache_size: int = 0,
+                 stats: Optional[Dict[int, Counter]] = None, serial_kinds=()) -> Iterator[List[str]]:
+    """
+    Lazily yield rows with their date columns in ISO-8601, the first row
+    (the header, if any) unchanged and short rows padded to its width. Without
+    a detection, the first sample_rows are buffered and detected as by
+    detect(), then yielded like the rest. If a stats dict is given, it is kept
+    up to date with a Counter of parse_value outcomes per converted column.
+    """
+    it = iter(rows)
+    if detection is None:
+        detection, head = _detect_rows(it, has_header, None, sample_rows, confidence, assume_order, force_order,
+                                       serial_kinds)
+        it = chain(head, it)
+    first = next(it, None)
+    if first is None:
         return
+    converter = RowConverter(detection.decisions, detection.formats, len(first), cache_size)
+    if stats is not None:
+        stats.update(converter.stats)
+        converter.stats = stats
+    yield first if detection.has_header else converter.convert(first)
+    for row in it:
+        yield converter.convert(row)
+
+def convert_stream(fin, fout, detection: Optional[Detection] = None, dialect=None,
+                   has_header: Optional[bool] = None, sample_rows: int = 200, confidence: int = 0,
+                   assume_order: Optional[str] = None, force_order: Optional[str] = None,
+                   cache_size: int = 0, serial_kinds=()) -> Tuple[Detection, Dict[int, Counter]]:
+    """
+    Convert CSV text from fin to fout (text streams, opened with newline="")
+    without printing or prompting. The dialect is taken from detection or
+    dialect, or sniffed from the first SNIFF_BYTES of lines read (which also
+    settles has_header unless given). Returns the detection used and the
+    parse_value outcomes per converted column.
+    """
+    if detection is not None and detection.dialect is not None:
+        dialect = detection.dialect
+    lines = fin
+    if dialect is None:
+        head_lines: List[str] = []
+        size = 0
+        for line in fin:
+            head_lines.append(line)
+            size += len(line)
+            if size >= SNIFF_BYTES:
+                break
+        dialect, sniffed_header = sniff_text("".join(head_lines))
+        if has_header is None:
+            has_header = sniffed_header
+        lines = chain(head_lines, fin)
+    rows: Iterator[List[str]] = csv.reader(lines, dialect)
+    if detection is None:
+        detection, head = _detect_rows(rows, True if has_header is None else has_header, dialect,
+                                       sample_rows, confidence, assume_order, force_order, serial_kinds)
+        rows = chain(head, rows)
+    stats: Dict[int, Counter] = {}
+    csv.writer(fout, dialect).writerows(convert_rows(rows, detection, cache_size=cache_size, stats=stats))
+    return detection, stats
+
+# pandas / NumPy backend: what convert_array and convert_frame produce for a date column
+ARRAY_OUTPUTS = ("iso", "datetime64")
+# longer distinct values are parsed one by one rather than in the vectorised template pass
+VECTOR_MAX_LEN = 64
+
+def _template_fields(values: List[str], fmt: str, order: str):
+    """
+    Parse the distinct values matching a column's template with array
+    operations: values are grouped by length and digit positions, each group
+    is checked against the template once, and its fields are read from the
+    digit positions as integer arrays. Returns (ok, fields): ok marks the
+    values parsed, fields maps y/m/d/hour/minute/second/micro/tz (offset
+    minutes) and aware to arrays over all values.
+    """
+    import numpy as np
+    n = len(values)
+    names = ("y", "m", "d", "hour", "minute", "second", "micro", "tz")
+    fields = {k: np.zeros(n, dtype=np.int64) for k in names}
+    fields["aware"] = np.zeros(n, dtype=bool)
+    ok = np.zeros(n, dtype=bool)
+    compiled = _compile_template(fmt, order)
+    if compiled is None or n == 0:
+        return ok, fields
+    rx, short_year = compiled
+    arr = np.array(values, dtype=str)
+    width = arr.dtype.itemsize // 4
+    codes = arr.view(np.uint32).reshape(n, width)
+    digit = (codes >= 48) & (codes <= 57)
+    keys = np.concatenate([np.char.str_len(arr)[:, None], digit], axis=1)
+    _, first, group = np.unique(keys, axis=0, return_index=True, return_inverse=True)
+    group = group.reshape(-1)
+    by_group = np.argsort(group, kind="stable")
+    bounds = np.concatenate([[0], np.cumsum(np.bincount(group))])
+
+    for g, rep in enumerate(first):
+        m = rx.match(values[rep])
+        if m is None:
+            continue
+        spans = {k: m.span(k) for k, v in m.groupdict().items() if v is not None}
+        if not all(digit[rep, s:e].all() for k, (s, e) in spans.items() if k != "tz"):
+            continue
+        rows = by_group[bounds[g]:bounds[g + 1]]
+        sub = codes[rows]
+        literal = ~digit[rep, :len(values[rep])]
+        tz = m.groupdict().get("tz")
+        if tz and tz != "Z":
+            # the offset's sign may differ between the group's values
+            literal[spans["tz"][0]] = False
+            sign = sub[:, spans["tz"][0]]
+            same = (sign == ord("+")) | (sign == ord("-"))
+        else:
+            same = np.ones(len(rows), dtype=bool)
+        same &= (sub[:, :len(literal)][:, literal] == codes[rep, :len(literal)][literal]).all(axis=1)
+        rows, sub = rows[same], sub[same]
+
+        def number(s: int, e: int):
+            return (sub[:, s:e].astype(np.int64) - 48) @ (10 ** np.arange(e - s - 1, -1, -1))
+
+        for k in ("y", "m", "d", "hour", "minute", "second"):
+            if k in spans:
+                fields[k][rows] = number(*spans[k])
+        if "frac" in spans:
+            s, e = spans["frac"]
+            e = min(e, s + 6)
+            fields["micro"][rows] = number(s, e) * 10 ** (6 - (e - s))
+        if tz == "Z":
+            fields["aware"][rows] = True
+        elif tz:
+            s, e = spans["tz"]
+            mins = number(s + 1, s + 3) * 60 + number(e - 2, e)
+            fields["tz"][rows] = np.where(sub[:, s] == ord("-"), -mins, mins)
+            fields["aware"][rows] = True
+        ok[rows] = True
+
+    y = fields["y"]
+    if short_year:
+        y += _CENTURY
+        y[:] = np.where(y >= _THIS_YEAR + 50, y - 100, np.where(y < _THIS_YEAR - 50, y + 100, y))
+    month = fields["m"]
+    valid = (month >= 1) & (month <= 12)
+    dim = np.array(_DAYS_IN_MONTH)[np.where(valid, month, 0)]
+    leap = (y % 4 == 0) & ((y % 100 != 0) | (y % 400 == 0))
+    dim = dim + ((month == 2) & leap)
+    valid &= (fields["d"] >= 1) & (fields["d"] <= dim) & (y >= 1)
+    valid &= (fields["hour"] <= 23) & (fields["minute"] <= 59) & (fields["second"] <= 59)
+    valid &= np.abs(fields["tz"]) < 24 * 60
+    return ok & valid, fields
+
+def _fields_datetime64(fields, utc: bool):
+    """datetime64[us] of _template_fields' fields; local time, or UTC for aware values if utc."""
+    import numpy as np
+    months = (fields["y"] - 1970) * 12 + fields["m"] - 1
+    days = months.astype("datetime64[M]").astype("datetime64[D]") + (fields["d"] - 1).astype("timedelta64[D]")
+    us = ((fields["hour"] * 60 + fields["minute"]) * 60 + fields["second"]) * 1000000 + fields["micro"]
+    if utc:
+        us = us - np.where(fields["aware"], fields["tz"], 0) * 60000000
+    return days.astype("datetime64[us]") + us.astype("timedelta64[us]")
+
+def _fields_iso(fields):
+    """format_iso of _template_fields' fields, as a string array."""
+    import numpy as np
+    local = _fields_datetime64(fields, utc=False)
+    aware = fields["aware"]
+    midnight = (local == local.astype("datetime64[D]")) & ~aware
+    timed = np.where(fields["micro"] != 0, local.astype(str), local.astype("datetime64[s]").astype(str))
+    iso = np.where(midnight, local.astype("datetime64[D]").astype(str), timed).astype(object)
+    if aware.any():
+        for off in np.unique(fields["tz"][aware]):
+            sel = aware & (fields["tz"] == off)
+            iso[sel] += f"{'-' if off < 0 else '+'}{abs(off) // 60:02d}:{abs(off) % 60:02d}"
+    return iso
+
+def convert_array(values, order: Optional[str] = None, fmt: Optional[str] = None, output: str = "iso",
+                  stats: Optional[Counter] = None, sample_rows: int = 200, assume_order: Optional[str] = None,
+                  serial_kinds=()):
+    """
+    Convert one column of dates given as a NumPy array (or any sequence) of
+    strings and return a NumPy array: ISO-8601 strings (unparsed values and
+    non-strings kept as they are) for output "iso", or datetime64[us] with NaT
+    for "datetime64", where values with a UTC offset are converted to UTC.
 
-    print(f"Detected delimiter='{dialect.delimiter}' quotechar='{getattr(dialect, 'quotechar', '\"')}' header={has_header}")
+    Without an order, the column is detected from its first sample_rows values
+    as by detect(), and returned unchanged if it isn't a date column. Each
+    distinct string is parsed once: those matching the column's template (fmt,
+    or inferred) with array operations, the rest by parse_value. The results
+    are the same as convert_file's. If stats is given, parse_value outcomes
+    are counted in it. An order in SERIAL_KINDS (or, when detecting, one of
+    serial_kinds) converts Excel serials or epochs, given as strings or numbers.
+    """
+    import numpy as np
+    if output not in ARRAY_OUTPUTS:
+        raise ValueError(f"output must be one of {', '.join(ARRAY_OUTPUTS)}")
+    arr = np.asarray(values, dtype=object).reshape(-1)
+    is_str = np.fromiter((isinstance(v, str) for v in arr), dtype=bool, count=len(arr))
+    strs = np.where(is_str, arr, "").astype(str)
+    if order is None:
+        if serial_kinds:
+            texts = [v if isinstance(v, str) else _number_text(v) for v in arr[:sample_rows].tolist()]
+        else:
+            texts = strs[:sample_rows].tolist()
+        order, fmt = _detect_column(texts, assume_order, serial_kinds)
+        if order is None:
+            return arr.copy() if output == "iso" else np.full(len(arr), np.datetime64("NaT", "us"))
+    if order in SERIAL_KINDS:
+        return _convert_serial_array(arr, order, output, stats)
+    if fmt is None:
+        fmt = infer_format([v.strip() for v in strs[:sample_rows].tolist() if v.strip()], order)
+        if fmt is not None and compile_format(fmt, order) is None:
+            fmt = None
 
-    decisions = decide_columns(header, sample_rows_data, no_prompt, assume_order, force_order)
-    if not decisions:
-        print("No date-like columns detected. Copying input to output unchanged.")
+    uniques, inverse = np.unique(strs, return_inverse=True)
+    uniques = uniques.tolist()
+    inverse = inverse.reshape(-1)
+    outcomes: List[Optional[str]] = [None] * len(uniques)
+    if fmt is not None:
+        short = [i for i, v in enumerate(uniques) if v and len(v) <= VECTOR_MAX_LEN]
+        ok, fields = _template_fields([uniques[i] for i in short], fmt, order)
+        vector = np.array(short, dtype=np.int64)[ok]
+        fields = {k: v[ok] for k, v in fields.items()}
     else:
-        picked = {header[i]: v for i, v in decisions.items()}
-        print("Date column decisions:")
-        for name, order in picked.items():
-            if order:
-                print(f"  - {name}: {order}")
+        vector, fields = np.zeros(0, dtype=np.int64), None
+    for i in vector.tolist():
+        v = uniques[i]
+        outcomes[i] = ISO_SKIPPED if len(v) in (10, 19) and is_iso_output(v, order) else PARSED_ORDER
+
+    # ISO output is built from the parsed fields, without datetimes (see parse_value)
+    build = _build_iso if output == "iso" else _build_datetime
+    parse = compile_format(fmt, order, build) if fmt is not None else None
+    parsed: Dict[int, Optional[datetime]] = {}
+    for i, v in enumerate(uniques):
+        if outcomes[i] is not None or not v.strip():
+            continue
+        if is_iso_output(v, order):
+            outcomes[i] = ISO_SKIPPED
+            if output == "datetime64":
+                parsed[i] = parse_value(v, order, parse)[0]
+        else:
+            parsed[i], outcomes[i] = parse_value(v, order, parse, build=build)
+
+    if stats is not None:
+        freq = np.bincount(inverse, minlength=len(uniques))
+        for i, outcome in enumerate(outcomes):
+            if outcome is not None:
+                stats[outcome] += int(freq[i])
+    if output == "iso":
+        out = np.array(uniques, dtype=object)
+        if fields is not None and len(vector):
+            out[vector] = _fields_iso(fields)
+        for i, iso in parsed.items():
+            if iso is not None and outcomes[i] != ISO_SKIPPED:
+                out[i] = iso
+        result = out[inverse]
+        result[~is_str] = arr[~is_str]
+        return result
+    out = np.full(len(uniques), np.datetime64("NaT", "us"))
+    if fields is not None and len(vector):
+        out[vector] = _fields_datetime64(fields, utc=True)
+    for i, dt in parsed.items():
+        if dt is not None:
+            if dt.tzinfo is not None:
+                dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+            out[i] = np.datetime64(dt, "us")
+    return out[inverse]
+
+def _convert_serial_array(arr, kind: str, output: str, stats: Optional[Counter]):
+    """convert_array for a SERIAL_KINDS column of strings or numbers, once per distinct value."""
+    import numpy as np
+    texts = np.array([v if isinstance(v, str) else _number_text(v) for v in arr.tolist()], dtype=str)
+    uniques, inverse = np.unique(texts, return_inverse=True)
+    inverse = inverse.reshape(-1)
+    results = [convert_serial(v, kind) if v.strip() else (None, None) for v in uniques.tolist()]
+    if stats is not None:
+        freq = np.bincount(inverse, minlength=len(uniques))
+        for (_, outcome), n in zip(results, freq.tolist()):
+            if outcome is not None:
+                stats[outcome] += n
+    converted = np.array([iso is not None for iso, _ in results], dtype=bool)[inverse]
+    if output == "iso":
+        out = np.array([iso for iso, _ in results], dtype=object)[inverse]
+        out[~converted] = arr[~converted]
+        return out
+    return np.array([np.datetime64(iso.removesuffix("+00:00"), "us") if iso else np.datetime64("NaT", "us")
+                     for iso, _ in results], dtype="datetime64[us]")[inverse]
+
+def _detect_column(samples: List[str], assume_order: Optional[str],
+                   serial_kinds=()) -> Tuple[Optional[str], Optional[str]]:
+    """Order and format template of one column's sample values, as detect() decides them."""
+    detection, _ = _detect_rows(chain([["value"]], ([v] for v in samples)), True, None,
+                                len(samples), 0, assume_order, None, serial_kinds)
+    return detection.decisions.get(0), detection.formats.get(0)
+
+def _frame_rows(df, limit: int, numbers: bool = False) -> List[List[str]]:
+    """The first limit rows of a DataFrame as strings, with "" for other cells (but numbers, if asked)."""
+    return [[v if isinstance(v, str) else (_number_text(v) if numbers else "") for v in row]
+            for row in df.iloc[:limit].to_numpy(dtype=object).tolist()]
+
+def _number_text(v) -> str:
+    """A numeric cell as convert_serial reads it ("" for NaN and non-numbers)."""
+    if isinstance(v, bool) or not isinstance(v, (int, float)) or v != v:
+        return ""
+    return str(int(v)) if float(v).is_integer() else repr(float(v))
+
+def detect_frame(df, sample_rows: int = 200, confidence: int = 0, assume_order: Optional[str] = None,
+                 force_order: Optional[str] = None, serial_kinds=()) -> Detection:
+    """
+    detect() on a pandas DataFrame's first sample_rows rows; only string
+    cells are considered, and numbers too if serial_kinds are given.
+    """
+    header = [str(c) for c in df.columns]
+    rows = chain([header], _frame_rows(df, sample_rows, bool(serial_kinds)))
+    return _detect_rows(rows, True, None, sample_rows, confidence, assume_order, force_order, serial_kinds)[0]
+
+def convert_frame(df, detection: Optional[Detection] = None, output: str = "iso", sample_rows: int = 200,
+                  confidence: int = 0, assume_order: Optional[str] = None, force_order: Optional[str] = None,
+                  stats: Optional[Dict[int, Counter]] = None, serial_kinds=()):
+    """
+    Return a copy of a pandas DataFrame with its date columns converted by
+    convert_array: ISO-8601 strings, or datetime64 columns for output
+    "datetime64". Columns are detected with detect_frame unless a detection
+    is given. If a stats dict is given, it gets a Counter of parse_value
+    outcomes per converted column index.
+    """
+    if detection is None:
+        detection = detect_frame(df, sample_rows, confidence, assume_order, force_order, serial_kinds)
+    out = df.copy()
+    for i, order in detection.decisions.items():
+        if not order:
+            continue
+        counts: Counter = Counter()
+        out.isetitem(i, convert_array(df.iloc[:, i].to_numpy(dtype=object), order, detection.formats.get(i),
+                                      output, counts))
+        if stats is not None:
+            stats[i] = counts
+    return out
+
+# batch mode: file names picked up from directories (before any compression extension)
+INPUT_SUFFIXES = (".csv", ".tsv")
+
+def _is_input_name(name: str) -> bool:
+    stem, ext = os.path.splitext(name.lower())
+    if ext in COMPRESSION_EXTS:
+        stem, ext = os.path.splitext(stem)
+    return ext in INPUT_SUFFIXES
+
+def _glob_root(pattern: str) -> str:
+    """The leading directories of a glob pattern that contain no wildcard."""
+    parts = []
+    for part in pattern.replace(os.sep, "/").split("/")[:-1]:
+        if any(c in part for c in "*?["):
+            break
+        parts.append(part)
+    return "/".join(parts) if parts else "."
+
+def collect_inputs(paths: List[str], recursive: bool = False) -> List[Tuple[str, str]]:
+    """
+    Expand files, directories and glob patterns into (path, relative path)
+    pairs, the relative path being where the file sits under the directory
+    or pattern it came from; files named directly are placed under their
+    common parent directory, so a/x.csv and b/x.csv stay apart. Directories
+    contribute their .csv/.tsv files (compressed or not), and with recursive
+    those of all subdirectories too.
+    Files that are the default output of another input (data_iso.csv next to
+    data.csv) are left out, so rerunning over a directory doesn't convert
+    earlier results.
+    """
+    import glob
+    found: List[Tuple[str, Optional[str]]] = []  # files named directly get their relative path below
+    for p in paths:
+        if os.path.isdir(p):
+            if recursive:
+                for dirpath, dirnames, filenames in os.walk(p):
+                    dirnames.sort()
+                    for name in sorted(filenames):
+                        if _is_input_name(name):
+                            path = os.path.join(dirpath, name)
+                            found.append((path, os.path.relpath(path, p)))
             else:
-                print(f"  - {name}: skipped")
-
-    with open(input_path, "r", newline="", encoding=encoding, errors="replace") as fin, \
-         open(output_path, "w", newline="", encoding=encoding) as fout:
-        reader = csv.reader(fin, dialect)
-        writer = csv.writer(fout, dialect)
-        first_row = next(reader, None)
-        if first_row is None:
-            return
-        writer.writerow(first_row)
-        for row in reader:
-            if len(row) < len(first_row):
-                row.extend([""] * (len(first_row) - len(row)))
-            out = list(row)
-            for idx, order in decisions.items():
-                if order is None:
-                    continue
-                val = row[idx]
-                if not val or not val.strip():
-                    continue
-                dt = try_parse(val, order) or try_parse(val, None)
-                if dt is not None:
-                    out[idx] = format_iso(dt)
-            writer.writerow(out)
+                for name in sorted(os.listdir(p)):
+                    path = os.path.join(p, name)
+                    if _is_input_name(name) and os.path.isfile(path):
+                        found.append((path, name))
+        elif any(c in p for c in "*?[") and not os.path.exists(p):
+            root = _glob_root(p)
+            for path in sorted(glob.glob(p, recursive=recursive)):
+                if os.path.isfile(path):
+                    found.append((path, os.path.relpath(path, root)))
+        else:
+            found.append((p, None))
+    named = [os.path.abspath(path) for path, rel in found if rel is None]
+    if named:
+        try:
+            root = os.path.commonpath([os.path.dirname(path) for path in named])
+        except ValueError:  # on different drives
+            root = None
+        for k, (path, rel) in enumerate(found):
+            if rel is None:
+                found[k] = (path, os.path.relpath(os.path.abspath(path), root) if root else os.path.basename(path))
+    seen = set()
+    unique = []
+    for path, rel in found:
+        key = os.path.abspath(path)
+        if key not in seen:
+            seen.add(key)
+            unique.append((path, rel))
+    outputs = {os.path.abspath(output_name(path)) for path, _ in unique}
+    return [(path, rel) for path, rel in unique if os.path.abspath(path) not in outputs]
+
+def _convert_one(task: Dict[str, object]) -> Dict[str, object]:
+    """
+    Batch worker: convert one file, catching errors so the batch carries on.
+    With "quiet", the status messages are captured rather than printed.
+    """
+    start = time.perf_counter()
+    result = {"input": task["input"], "output": task["output"], "stats": {}, "error": None}
+    log = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(log) if task["quiet"] else contextlib.nullcontext():
+            result["stats"] = convert_file(task["input"], task["output"], **task["options"])
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    result["seconds"] = time.perf_counter() - start
+    result["log"] = log.getvalue()
+    return result
+
+def convert_batch(inputs: List[Tuple[str, str]], output_dir: Optional[str], jobs: int,
+                  options: Dict[str, object]) -> List[Dict[str, object]]:
+    """
+    Convert (path, relative path) inputs with up to `jobs` files at a time,
+    each in its own process, and print a per-file summary. Files converted in
+    parallel have their messages printed as each one finishes. Outputs go to
+    output_dir/<relative path>, mirroring the input tree, or next to each
+    input with the default _iso name. Returns the _convert_one results in
+    input order.
+    """
+    tasks = []
+    results: List[Optional[Dict[str, object]]] = [None] * len(inputs)
+    claimed: Dict[str, str] = {}  # output path -> the input writing it
+    for k, (path, rel) in enumerate(inputs):
+        out = os.path.join(output_dir, rel) if output_dir else output_name(path)
+        error = None
+        if os.path.abspath(out) == os.path.abspath(path):
+            error = "output would overwrite the input"
+        elif os.path.abspath(out) in claimed:
+            error = f"output would overwrite that of {claimed[os.path.abspath(out)]}"
+        if error:
+            results[k] = {"input": path, "output": out, "stats": {}, "seconds": 0.0, "log": "", "error": error}
+            continue
+        claimed[os.path.abspath(out)] = path
+        if os.path.dirname(out):
+            os.makedirs(os.path.dirname(out), exist_ok=True)
+        tasks.append((k, {"input": path, "output": out, "options": options, "quiet": jobs > 1}))
+
+    if jobs > 1 and len(tasks) > 1:
+        from concurrent.futures import ProcessPoolExecutor, as_completed
+        with ProcessPoolExecutor(max_workers=min(jobs, len(tasks))) as pool:
+            futures = {pool.submit(_convert_one, task): k for k, task in tasks}
+            for done, future in enumerate(as_completed(futures), start=1):
+                result = future.result()
+                results[futures[future]] = result
+                status = "failed" if result["error"] else "ok"
+                print(f"[{done}/{len(tasks)}] {result['input']}: {status}")
+                # the file's own messages (decisions, warnings, --profile), as a single run prints them
+                for line in result["log"].splitlines():
+                    print(f"    {line}")
+    else:
+        for done, (k, task) in enumerate(tasks, start=1):
+            print(f"[{done}/{len(tasks)}] {task['input']}")
+            results[k] = _convert_one(task)
+
+    print("Summary:")
+    for result in results:
+        if result["error"]:
+            print(f"  - {result['input']}: FAILED ({result['error']})")
+            continue
+        totals: Counter = Counter()
+        for counts in result["stats"].values():
+            totals.update(counts)
+        converted = totals[PARSED_ORDER] + totals[PARSED_FALLBACK]
+        print(f"  - {result['input']} -> {result['output']}: {len(result['stats'])} date columns, "
+              f"{converted} converted, {totals[ISO_SKIPPED]} already ISO, {totals[PARSE_FAILED]} failed "
+              f"({result['seconds']:.1f}s)")
+    return results
+
+def parse_serial_kinds(text: str) -> Tuple[str, ...]:
+    """'excel,epoch' -> SERIAL_KINDS members for --serial-dates; epoch is both epoch kinds, all is every kind."""
+    kinds: List[str] = []
+    for part in text.split(","):
+        name = part.strip().upper()
+        if name == "ALL":
+            kinds.extend(SERIAL_KINDS)
+        elif name == "EPOCH":
+            kinds.extend(("EPOCH_S", "EPOCH_MS"))
+        elif name in SERIAL_KINDS:
+            kinds.append(name)
+        else:
+            raise argparse.ArgumentTypeError(
+                f"unknown kind {part!r} (use excel, epoch_s, epoch_ms, epoch or all)")
+    return tuple(dict.fromkeys(kinds))
+
+def parse_serial_column(text: str) -> Tuple[str, str]:
+    """'NAME=KIND' -> (NAME, KIND) for --serial-column."""
+    name, sep, kind = text.rpartition("=")
+    kinds = parse_serial_kinds(kind) if sep and name else ()
+    if len(kinds) != 1:
+        raise argparse.ArgumentTypeError(f"expected NAME=KIND with KIND one of excel, epoch_s, epoch_ms, not {text!r}")
+    return name, kinds[0]
 
 def main():
     ap = argparse.ArgumentParser(
         description="Convert date columns in a CSV to ISO-8601, auto-detecting columns and locale."
     )
-    ap.add_argument("input", help="Path to input CSV")
-    ap.add_argument("-o", "--output", help="Path to output CSV (default: add _iso before extension)")
+    ap.add_argument("input", nargs="+",
+                    help="Path to input CSV, or - for standard input. Several files, directories "
+                         "and glob patterns convert them all (batch mode)")
+    ap.add_argument("-o", "--output",
+                    help="Path to output CSV, or - for standard output (default: add _iso before extension; "
+                         "- when reading standard input)")
+    ap.add_argument("--output-dir",
+                    help="Batch mode: write outputs here, mirroring the input tree, under their own names "
+                         "(default: next to each input, with _iso added)")
+    ap.add_argument("-r", "--recursive", action="store_true",
+                    help="Batch mode: also convert CSV files in subdirectories of the given directories.")
     ap.add_argument("--encoding", default="utf-8", help="File encoding (default: utf-8)")
     ap.add_argument("--sample-rows", type=int, default=200, help="Rows to sample for detection (default: 200)")
+    ap.add_argument("--confidence", type=int, default=0,
+                    help="Stop sampling a column once one order leads the others by this many votes, "
+                         "so --sample-rows can be set high cheaply (default: 0 = off)")
+    ap.add_argument("--sample-mode", choices=SAMPLE_MODES, default="head",
+                    help="Which rows to sample: the first ones (head), a uniform sample of the whole file "
+                         "(reservoir, reads it all), or evenly spaced offsets (spread, seeks) (default: head)")
 
     # NEW: batch-friendly flags
     ap.add_argument("--no-prompt", action="store_true",
@@ -302,18 +2871,84 @@ def main():
                     help="Default order to use when a column is ambiguous (used only if --no-prompt).")
     ap.add_argument("--force-order", choices=["DMY", "MDY", "YMD"],
                     help="Force this order for ALL detected date-like columns (skips inference).")
+    ap.add_argument("--serial-dates", type=parse_serial_kinds, default=(), metavar="KINDS",
+                    help="Also detect numeric date columns of these kinds, comma-separated: excel (serial "
+                         "days, e.g. 45512.5), epoch_s, epoch_ms, epoch (both) or all (default: none)")
+    ap.add_argument("--serial-column", type=parse_serial_column, action="append", default=[],
+                    metavar="NAME=KIND",
+                    help="Convert column NAME (or col_N without a header) as excel, epoch_s or epoch_ms "
+                         "values; repeatable.")
+    ap.add_argument("--cache-size", type=int, default=0,
+                    help="Remember this many distinct (value, order) conversions, LRU-evicted (default: 0 = off).")
+    ap.add_argument("-j", "--jobs", type=int, default=1,
+                    help="Convert large files with this many processes; in batch mode, convert this many "
+                         "files at a time (default: 1).")
+    ap.add_argument("--save-schema", metavar="FILE",
+                    help="Save the detected dialect and column decisions to this JSON file for --schema.")
+    ap.add_argument("--schema", metavar="FILE",
+                    help="Use the dialect and column decisions saved by --save-schema instead of detecting them.")
+    ap.add_argument("--profile", action="store_true",
+                    help="Print time per phase, throughput, and per-column parse times and methods.")
+    ap.add_argument("--profile-out", metavar="FILE",
+                    help="Also write cProfile statistics of the run to FILE (for pstats or snakeviz).")
+    ap.add_argument("--passthrough", action="store_true",
+                    help="Copy records whose dates need no change as they are, keeping their original quoting.")
+    ap.add_argument("--pipeline", action="store_true",
+                    help="Read, convert and write in separate threads joined by bounded queues, so I/O and "
+                         "compression overlap the conversion.")
+    ap.add_argument("--no-intern", dest="intern", action="store_false",
+                    help="Don't keep a per-column table of converted values (kept by default, and dropped "
+                         "for columns with too many distinct values).")
 
-    args = ap.parse_args()
+    args = ap.parse_intermixed_args()
+    if args.profile_out:
+        import cProfile
+        profiler = cProfile.Profile()
+        try:
+            profiler.runcall(run, ap, args)
+        finally:
+            profiler.dump_stats(args.profile_out)
+            print(f"Wrote cProfile statistics: {args.profile_out}", file=sys.stderr)
+    else:
+        run(ap, args)
+
+def run(ap: argparse.ArgumentParser, args: argparse.Namespace) -> None:
+    """Carry out the command line parsed by main."""
+    batch = (len(args.input) > 1 or args.output_dir or args.recursive
+             or any(os.path.isdir(p) or (any(c in p for c in "*?[") and not os.path.exists(p))
+                    for p in args.input))
+    if batch:
+        if args.output or STDIO in args.input:
+            ap.error("-o/--output and - need a single input file; use --output-dir for several")
+        if args.save_schema:
+            ap.error("--save-schema needs a single input file")
+        inputs = collect_inputs(args.input, args.recursive)
+        if not inputs:
+            print("No input files found.")
+            sys.exit(1)
+        if args.jobs > 1 and not args.no_prompt:
+            print("Note: converting files in parallel, so not prompting (as with --no-prompt).")
+        options = dict(encoding=args.encoding, sample_rows=args.sample_rows, sample_mode=args.sample_mode,
+                       confidence=args.confidence, no_prompt=args.no_prompt or args.jobs > 1,
+                       assume_order=args.assume, force_order=args.force_order,
+                       cache_size=args.cache_size, passthrough=args.passthrough, schema=args.schema,
+                       profile=args.profile, serial_kinds=args.serial_dates,
+                       serial_columns=dict(args.serial_column), pipeline=args.pipeline,
+                       intern=args.intern)
+        try:
+            results = convert_batch(inputs, args.output_dir, args.jobs, options)
+        except KeyboardInterrupt:
+            print("\nAborted by user.", file=sys.stderr)
+            sys.exit(1)
+        sys.exit(1 if any(r["error"] for r in results) else 0)
 
-    input_path = args.input
+    input_path = args.input[0]
     if args.output:
         output_path = args.output
+    elif input_path == STDIO:
+        output_path = STDIO
     else:
-        if "." in input_path.rsplit("/", 1)[-1]:
-            base, ext = input_path.rsplit(".", 1)
-            output_path = f"{base}_iso.{ext}"
-        else:
-            output_path = f"{input_path}_iso"
+        output_path = output_name(input_path)
 
     try:
         convert_file(
@@ -321,14 +2956,34 @@ def main():
             output_path=output_path,
             encoding=args.encoding,
             sample_rows=args.sample_rows,
-            no_prompt=args.no_prompt,
+            sample_mode=args.sample_mode,
+            confidence=args.confidence,
+            # stdin holds the data and stdout may too, so there is no one to ask
+            no_prompt=args.no_prompt or STDIO in (input_path, output_path),
             assume_order=args.assume,
             force_order=args.force_order,
+            cache_size=args.cache_size,
+            jobs=args.jobs,
+            passthrough=args.passthrough,
+            schema=args.schema,
+            save_schema_path=args.save_schema,
+            profile=args.profile,
+            serial_kinds=args.serial_dates,
+            serial_columns=dict(args.serial_column),
+            pipeline=args.pipeline,
+            intern=args.intern,
         )
-        print(f"Done. Wrote: {output_path}")
+        if output_path == STDIO:
+            print("Done. Wrote: standard output", file=sys.stderr)
+        else:
+            print(f"Done. Wrote: {output_path}")
     except KeyboardInterrupt:
         print("\nAborted by user.", file=sys.stderr)
         sys.exit(1)
+    except BrokenPipeError:
+        # the reader went away (e.g. `| head`); don't complain again at exit
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        sys.exit(1)
 
 if __name__ == "__main__":
     main()
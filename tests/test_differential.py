@@ -0,0 +1,210 @@
+"""
+Differential tests: the native parsers and the ISO formatter must agree with
+dateutil.parser and with the isoformat-based format_iso they replaced, so the
+converted output stays what it was. Inputs are random but seeded.
+"""
+import os
+import random
+import sys
+import unittest
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import fix_dates  # noqa: E402
+
+try:
+    from dateutil import parser as du
+except ImportError:
+    du = None
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+ORDERS = (None, "DMY", "MDY", "YMD")
+MONTH_NAMES = ["Jan", "january", "FEB", "Mar", "apr", "May", "june", "Jul", "AUG", "Sep",
+               "sept", "September", "oct", "Nov", "dec", "December", "Mon", "Augustus"]
+OFFSETS = ["Z", "+02:00", "-0530", "+0000", "-00:00", "+14:00", "+23:59"]
+# dateutil accepts offsets of 24h or more, which datetime then can't show
+BAD_OFFSETS = OFFSETS + ["-2400", "+9900"]
+
+
+def reference_format_iso(dt: datetime) -> str:
+    """format_iso as it was before iso_from_fields."""
+    if dt.tzinfo:
+        return dt.isoformat()
+    if dt.hour == 0 and dt.minute == 0 and dt.second == 0 and dt.microsecond == 0:
+        return dt.date().isoformat()
+    s = dt.isoformat()
+    if s.endswith(".000000"):
+        s = s[:-7]
+    return s
+
+
+def isoformat(dt):
+    try:
+        return dt.isoformat() if dt is not None else None
+    except ValueError:
+        return None
+
+
+def dateutil_parse(s, order):
+    try:
+        return du.parse(s, **fix_dates._dateutil_kwargs(order))
+    except Exception:
+        return None
+
+
+def time_suffix(rng: random.Random, offsets) -> str:
+    s = rng.choice(" T") + str(rng.randint(0, 25)).zfill(rng.choice([1, 2])) + ":" + str(rng.randint(0, 61)).zfill(2)
+    if rng.random() < 0.6:
+        s += ":" + str(rng.randint(0, 61)).zfill(2)
+        if rng.random() < 0.5:
+            s += "." + str(rng.randint(0, 10**9)).zfill(9)[:rng.randint(1, 9)]
+    if rng.random() < 0.5:
+        s += rng.choice(["", " "]) + rng.choice(offsets)
+    return s
+
+
+def numeric_value(rng: random.Random, offsets=OFFSETS) -> str:
+    def tok(n):
+        return str(rng.randint(0, 10**n - 1)).zfill(rng.choice([1, n]))
+    a = rng.choice([tok(1), tok(2), tok(4), str(rng.randint(1900, 2100)), tok(3)])
+    b = rng.choice([tok(1), tok(2), str(rng.randint(1, 12)), str(rng.randint(1, 31)).zfill(2)])
+    c = rng.choice([tok(2), tok(4), str(rng.randint(1, 31)), str(rng.randint(1900, 2100)), tok(3)])
+    sep = rng.choice("-/. ")
+    s = a + sep + b + sep + c
+    if rng.random() < 0.5:
+        s += time_suffix(rng, offsets)
+    return s
+
+
+def month_name_value(rng: random.Random, offsets=OFFSETS) -> str:
+    def num(lo, hi, width=2):
+        s = str(rng.randint(lo, hi))
+        return s.zfill(width) if rng.random() < 0.3 else s
+    mon = rng.choice(MONTH_NAMES)
+    year = rng.choice([num(0, 99), num(1900, 2100), num(0, 999, 3)])
+    if rng.random() < 0.5:
+        sep = rng.choice("-/. ")
+        s = f"{num(0, 35)}{sep}{mon}{sep}{year}"
+    else:
+        s = f"{mon} {num(0, 35)}{rng.choice(['', ','])} {year}"
+    if rng.random() < 0.5:
+        s += time_suffix(rng, offsets)
+    if rng.random() < 0.1:
+        s = " " + s + " "
+    return s
+
+
+def layout_values(rng: random.Random, n: int):
+    """n values sharing one layout, as a date column would."""
+    order = rng.choice(["DMY", "MDY", "YMD"])
+    sep = rng.choice("-/.")
+    pad = rng.random() < 0.7
+    short_year = rng.random() < 0.2
+    time = rng.choice(["", " %H:%M", "T%H:%M:%S", " %H:%M:%S.%f"])
+    values = []
+    for _ in range(n):
+        dt = datetime(rng.randint(1950, 2049), rng.randint(1, 12), rng.randint(1, 28),
+                      rng.randint(0, 23), rng.randint(0, 59), rng.randint(0, 59), rng.randint(0, 999999))
+        year = f"{dt.year % 100:02d}" if short_year else str(dt.year)
+        month = f"{dt.month:02d}" if pad else str(dt.month)
+        day = f"{dt.day:02d}" if pad else str(dt.day)
+        fields = {"DMY": (day, month, year), "MDY": (month, day, year), "YMD": (year, month, day)}[order]
+        values.append(sep.join(fields) + dt.strftime(time))
+    return order, values
+
+
+@unittest.skipIf(du is None, "python-dateutil is not installed")
+class DateutilAgreementTest(unittest.TestCase):
+    def test_numeric(self):
+        rng = random.Random(1)
+        for _ in range(3000):
+            s = numeric_value(rng, BAD_OFFSETS)
+            for order in ORDERS:
+                self.assertEqual(isoformat(fix_dates.try_parse(s, order)),
+                                 isoformat(dateutil_parse(s, order)), (s, order))
+
+    def test_month_name(self):
+        rng = random.Random(2)
+        matched = 0
+        for _ in range(3000):
+            s = month_name_value(rng, BAD_OFFSETS)
+            m = fix_dates.MONTH_NAME_DATE_RE.match(s)
+            if m is None:
+                continue
+            matched += 1
+            for order in ORDERS:
+                self.assertEqual(isoformat(fix_dates.month_name_parse(m, order)),
+                                 isoformat(dateutil_parse(s, order)), (s, order))
+        self.assertGreater(matched, 1000)
+
+
+class FormatIsoTest(unittest.TestCase):
+    def test_matches_isoformat(self):
+        rng = random.Random(3)
+        offsets = [None, timezone.utc, timezone(timedelta(hours=5, minutes=30)),
+                   timezone(timedelta(hours=-23, minutes=-59)), timezone(timedelta(seconds=-3601))]
+        for _ in range(20000):
+            dt = datetime(rng.choice([1, 99, 999, rng.randint(1000, 9999)]), rng.randint(1, 12), rng.randint(1, 28),
+                          *(rng.randint(0, 23), rng.randint(0, 59), rng.randint(0, 59)) if rng.random() < 0.7 else (),
+                          microsecond=rng.choice([0, 0, 1, rng.randint(0, 999999)]), tzinfo=rng.choice(offsets))
+            self.assertEqual(fix_dates.format_iso(dt), reference_format_iso(dt), dt)
+
+    def test_convert_value(self):
+        rng = random.Random(4)
+        for _ in range(3000):
+            s = numeric_value(rng) if rng.random() < 0.7 else month_name_value(rng)
+            for order in ("DMY", "MDY", "YMD"):
+                dt, outcome = fix_dates.parse_value(s, order)
+                want = (reference_format_iso(dt) if dt is not None else None, outcome)
+                self.assertEqual(fix_dates.convert_value(s, order), want, (s, order))
+
+
+class TemplateTest(unittest.TestCase):
+    def test_template_matches_try_parse(self):
+        rng = random.Random(5)
+        for _ in range(200):
+            order, values = layout_values(rng, 50)
+            fmt = fix_dates.infer_format(values, order)
+            if fmt is None:
+                continue
+            parse = fix_dates.compile_format(fmt, order)
+            parse_iso = fix_dates.compile_format(fmt, order, build=fix_dates._build_iso)
+            if parse is None:
+                continue
+            for s in values + [numeric_value(rng) for _ in range(20)]:
+                dt = parse(s)
+                if dt is None:
+                    self.assertIsNone(parse_iso(s), (fmt, s))
+                    continue
+                self.assertEqual(dt, fix_dates.try_parse(s, order), (fmt, s))
+                self.assertEqual(parse_iso(s), fix_dates.format_iso(dt), (fmt, s))
+
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class ConvertArrayTest(unittest.TestCase):
+    def test_matches_row_converter(self):
+        rng = random.Random(6)
+        for _ in range(30):
+            order, values = layout_values(rng, rng.randint(1, 200))
+            values += [numeric_value(rng) for _ in range(rng.randint(0, 40))]
+            values += rng.sample(["", "  ", "junk", "25 Aug 2024", "2024-01-01"], 2)
+            rng.shuffle(values)
+            fmt = fix_dates.infer_format([v.strip() for v in values if v.strip()], order)
+            if fmt is not None and fix_dates.compile_format(fmt, order) is None:
+                fmt = None
+            stats = Counter()
+            got = fix_dates.convert_array(np.array(values, dtype=object), order, fmt, "iso", stats,
+                                          sample_rows=len(values))
+            conv = fix_dates.RowConverter({0: order}, {0: fmt} if fmt else {}, 1)
+            self.assertEqual(list(got), [conv.convert([v])[0] for v in values], (order, fmt))
+            self.assertEqual(dict(stats), dict(conv.stats[0]), (order, fmt))
+
+
+if __name__ == "__main__":
+    unittest.main()